@@ -15,6 +15,18 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Postgres-only search objects, kept off the models so SQLite tooling can
+# still create_all; autogenerate must not try to drop them.
+UNMAPPED_OBJECTS = {
+    "content_tsv",
+    "ix_group_messages_content_tsv",
+    "ix_group_messages_content_trgm",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (reflected and compare_to is None and name in UNMAPPED_OBJECTS)
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -23,6 +35,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -37,7 +50,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
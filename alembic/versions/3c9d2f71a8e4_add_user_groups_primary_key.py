@@ -0,0 +1,36 @@
+"""add user_groups primary key
+
+Revision ID: 3c9d2f71a8e4
+Revises: 5583f68134ea
+Create Date: 2026-10-18 10:12:41.503217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "3c9d2f71a8e4"
+down_revision: Union[str, None] = "5583f68134ea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows the primary key would reject: orphans and duplicate memberships
+    op.execute("DELETE FROM user_groups WHERE user_id IS NULL OR group_id IS NULL")
+    op.execute("""
+        DELETE FROM user_groups a
+        USING user_groups b
+        WHERE a.ctid < b.ctid
+          AND a.group_id = b.group_id
+          AND a.user_id = b.user_id
+    """)
+
+    op.create_primary_key("user_groups_pkey", "user_groups", ["group_id", "user_id"])
+    op.create_index("ix_user_groups_user_id", "user_groups", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_groups_user_id", table_name="user_groups")
+    op.drop_constraint("user_groups_pkey", "user_groups", type_="primary")
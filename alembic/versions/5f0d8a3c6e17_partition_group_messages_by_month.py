@@ -0,0 +1,193 @@
+"""partition group_messages by month
+
+Revision ID: 5f0d8a3c6e17
+Revises: e3b7c1a9d052
+Create Date: 2026-10-18 21:27:09.815530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from app.core.config import settings
+
+revision: str = "5f0d8a3c6e17"
+down_revision: Union[str, None] = "e3b7c1a9d052"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, content, group_id, author_id, lawyer_author_id, created_at, updated_at"
+
+INDEXES = (
+    "ix_group_messages_id",
+    "ix_group_messages_group_id_created_at_id",
+    "ix_group_messages_content_tsv",
+    "ix_group_messages_content_trgm",
+)
+
+
+def create_indexes() -> None:
+    op.execute("CREATE INDEX ix_group_messages_id ON group_messages (id)")
+    op.execute(
+        "CREATE INDEX ix_group_messages_group_id_created_at_id "
+        "ON group_messages (group_id, created_at, id)"
+    )
+    op.execute(
+        "CREATE INDEX ix_group_messages_content_tsv "
+        "ON group_messages USING gin (content_tsv)"
+    )
+    op.execute(
+        "CREATE INDEX ix_group_messages_content_trgm "
+        "ON group_messages USING gin (content gin_trgm_ops)"
+    )
+
+
+def upgrade() -> None:
+    config = settings.message_search_config.replace("'", "''")
+
+    # Rebuilds the table: copies every row under an exclusive lock, so run it
+    # in a maintenance window. A partitioned table's primary key has to
+    # include the partition key; ids still come from the same sequence.
+    op.execute("LOCK TABLE group_messages IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE group_messages RENAME TO group_messages_legacy")
+    op.execute("ALTER INDEX group_messages_pkey RENAME TO group_messages_legacy_pkey")
+    op.execute(f"DROP INDEX IF EXISTS {', '.join(INDEXES)}")
+    op.execute("""
+        UPDATE group_messages_legacy
+        SET created_at = coalesce(updated_at, now())
+        WHERE created_at IS NULL
+    """)
+
+    op.execute(f"""
+        CREATE TABLE group_messages (
+            id integer NOT NULL DEFAULT nextval('group_messages_id_seq'),
+            content text NOT NULL,
+            group_id integer NOT NULL
+                REFERENCES groups (id) ON DELETE CASCADE,
+            author_id integer REFERENCES users (id) ON DELETE CASCADE,
+            lawyer_author_id integer REFERENCES lawyers (id) ON DELETE CASCADE,
+            created_at timestamptz NOT NULL,
+            updated_at timestamptz,
+            content_tsv tsvector GENERATED ALWAYS AS
+                (to_tsvector('{config}'::regconfig, content)) STORED,
+            CONSTRAINT group_messages_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE group_messages_id_seq OWNED BY group_messages.id")
+
+    # Catches rows outside every monthly partition, so an insert never fails
+    # because maintenance fell behind
+    op.execute(
+        "CREATE TABLE group_messages_default PARTITION OF group_messages DEFAULT"
+    )
+
+    # Month bounds are UTC. Rows that reached the default partition are
+    # moved into a new partition for their month as it is created.
+    op.execute(f"""
+        CREATE FUNCTION create_group_messages_partition(month_start timestamp)
+        RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            partition_name text :=
+                format('group_messages_%s', to_char(month_start, 'YYYY_MM'));
+            lower_bound timestamptz := month_start AT TIME ZONE 'UTC';
+            upper_bound timestamptz :=
+                (month_start + interval '1 month') AT TIME ZONE 'UTC';
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN;
+            END IF;
+            CREATE TEMP TABLE group_messages_moved ON COMMIT DROP AS
+                SELECT {COLUMNS} FROM group_messages_default
+                WHERE created_at >= lower_bound AND created_at < upper_bound;
+            DELETE FROM group_messages_default
+                WHERE created_at >= lower_bound AND created_at < upper_bound;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF group_messages '
+                'FOR VALUES FROM (%L) TO (%L)',
+                partition_name, lower_bound, upper_bound
+            );
+            INSERT INTO group_messages ({COLUMNS})
+                SELECT {COLUMNS} FROM group_messages_moved;
+            DROP TABLE group_messages_moved;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE FUNCTION ensure_group_messages_partitions(months_ahead integer)
+        RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            this_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC');
+        BEGIN
+            -- Every worker runs this; one at a time
+            PERFORM pg_advisory_xact_lock(hashtext('group_messages_partitions'));
+            PERFORM create_group_messages_partition(month_start)
+            FROM generate_series(
+                this_month,
+                this_month + make_interval(months => months_ahead),
+                interval '1 month'
+            ) AS month_start;
+        END
+        $$
+    """)
+
+    op.execute("""
+        SELECT create_group_messages_partition(month_start)
+        FROM generate_series(
+            date_trunc(
+                'month', (SELECT min(created_at) FROM group_messages_legacy)
+                AT TIME ZONE 'UTC'
+            ),
+            date_trunc('month', now() AT TIME ZONE 'UTC'),
+            interval '1 month'
+        ) AS month_start
+    """)
+    op.execute(
+        "SELECT ensure_group_messages_partitions("
+        f"{int(settings.message_partition_months_ahead)})"
+    )
+    op.execute(f"""
+        INSERT INTO group_messages ({COLUMNS})
+        SELECT {COLUMNS} FROM group_messages_legacy
+    """)
+    # Built after the copy, one bulk build per partition
+    create_indexes()
+    op.execute("DROP TABLE group_messages_legacy")
+
+
+def downgrade() -> None:
+    # Archived partitions are not restored; import their exports first if
+    # their rows are needed
+    config = settings.message_search_config.replace("'", "''")
+
+    op.execute("LOCK TABLE group_messages IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE group_messages RENAME TO group_messages_partitioned")
+    op.execute(
+        "ALTER INDEX group_messages_pkey RENAME TO group_messages_partitioned_pkey"
+    )
+    op.execute(f"DROP INDEX IF EXISTS {', '.join(INDEXES)}")
+
+    op.execute(f"""
+        CREATE TABLE group_messages (
+            id integer NOT NULL DEFAULT nextval('group_messages_id_seq'),
+            content text NOT NULL,
+            group_id integer NOT NULL
+                REFERENCES groups (id) ON DELETE CASCADE,
+            author_id integer REFERENCES users (id) ON DELETE CASCADE,
+            lawyer_author_id integer REFERENCES lawyers (id) ON DELETE CASCADE,
+            created_at timestamptz,
+            updated_at timestamptz,
+            content_tsv tsvector GENERATED ALWAYS AS
+                (to_tsvector('{config}'::regconfig, content)) STORED,
+            CONSTRAINT group_messages_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE group_messages_id_seq OWNED BY group_messages.id")
+    op.execute(f"""
+        INSERT INTO group_messages ({COLUMNS})
+        SELECT {COLUMNS} FROM group_messages_partitioned
+    """)
+    create_indexes()
+
+    op.execute("DROP TABLE group_messages_partitioned")
+    op.execute("DROP FUNCTION ensure_group_messages_partitions(integer)")
+    op.execute("DROP FUNCTION create_group_messages_partition(timestamp)")
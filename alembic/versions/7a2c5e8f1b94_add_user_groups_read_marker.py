@@ -0,0 +1,45 @@
+"""add user_groups read marker
+
+Revision ID: 7a2c5e8f1b94
+Revises: d41f7b2e9a63
+Create Date: 2026-10-18 16:40:52.301166
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "7a2c5e8f1b94"
+down_revision: Union[str, None] = "d41f7b2e9a63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_groups", sa.Column("last_read_message_id", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "user_groups",
+        sa.Column("last_read_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Existing members start caught up rather than with their whole history
+    # unread
+    op.execute("""
+        UPDATE user_groups ug
+        SET last_read_message_id = lm.id, last_read_at = lm.created_at
+        FROM (
+            SELECT DISTINCT ON (group_id) group_id, id, created_at
+            FROM group_messages
+            ORDER BY group_id, created_at DESC, id DESC
+        ) lm
+        WHERE lm.group_id = ug.group_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("user_groups", "last_read_at")
+    op.drop_column("user_groups", "last_read_message_id")
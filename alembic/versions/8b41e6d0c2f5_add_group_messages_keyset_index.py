@@ -0,0 +1,38 @@
+"""add group_messages keyset index
+
+Revision ID: 8b41e6d0c2f5
+Revises: 3c9d2f71a8e4
+Create Date: 2026-10-18 11:03:27.118904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "8b41e6d0c2f5"
+down_revision: Union[str, None] = "3c9d2f71a8e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build without locking writes; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_group_messages_group_id_created_at_id",
+            "group_messages",
+            ["group_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_group_messages_group_id_created_at_id",
+            table_name="group_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,39 @@
+"""add lawyer_groups primary key
+
+Revision ID: d41f7b2e9a63
+Revises: 8b41e6d0c2f5
+Create Date: 2026-10-18 15:02:17.884310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "d41f7b2e9a63"
+down_revision: Union[str, None] = "8b41e6d0c2f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Both key columns were nullable, so half-written memberships can exist
+    op.execute("DELETE FROM lawyer_groups WHERE lawyer_id IS NULL OR group_id IS NULL")
+    # A lawyer added to the same group more than once keeps the row stored last
+    op.execute("""
+        DELETE FROM lawyer_groups a
+        USING lawyer_groups b
+        WHERE a.ctid < b.ctid
+          AND a.group_id = b.group_id
+          AND a.lawyer_id = b.lawyer_id
+    """)
+
+    op.create_primary_key(
+        "lawyer_groups_pkey", "lawyer_groups", ["group_id", "lawyer_id"]
+    )
+    op.create_index("ix_lawyer_groups_lawyer_id", "lawyer_groups", ["lawyer_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lawyer_groups_lawyer_id", table_name="lawyer_groups")
+    op.drop_constraint("lawyer_groups_pkey", "lawyer_groups", type_="primary")
@@ -0,0 +1,63 @@
+"""add group_messages search
+
+Revision ID: e3b7c1a9d052
+Revises: 7a2c5e8f1b94
+Create Date: 2026-10-18 19:12:45.604317
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from app.core.config import settings
+
+revision: str = "e3b7c1a9d052"
+down_revision: Union[str, None] = "7a2c5e8f1b94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The column bakes in the text search configuration; changing
+    # MESSAGE_SEARCH_CONFIG later means re-creating it. Adding a stored
+    # generated column rewrites the table under an exclusive lock.
+    config = settings.message_search_config.replace("'", "''")
+    op.execute(f"""
+        ALTER TABLE group_messages
+        ADD COLUMN IF NOT EXISTS content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('{config}'::regconfig, content)) STORED
+    """)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_group_messages_content_tsv",
+            "group_messages",
+            ["content_tsv"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Substring matching for languages the configuration cannot stem,
+        # such as Korean, where particles attach to the word
+        op.create_index(
+            "ix_group_messages_content_trgm",
+            "group_messages",
+            ["content"],
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in ("ix_group_messages_content_trgm", "ix_group_messages_content_tsv"):
+            op.drop_index(
+                name,
+                table_name="group_messages",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    op.drop_column("group_messages", "content_tsv")
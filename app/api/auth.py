@@ -32,7 +32,7 @@ async def register(
     user_service: Annotated[UserService, Depends(get_user_service)],
 ):
     try:
-        return auth_service.create_user(user=user)
+        return await auth_service.create_user(user=user)
     except IntegrityError:
         raise ConflictException("Username already registered")
 
@@ -42,7 +42,7 @@ async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ):
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    user = await auth_service.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise UnauthorizedException("Incorrect username or password")
 
@@ -70,7 +70,7 @@ async def logout(
             else settings.access_token_expire_minutes * 60
         )
 
-        await add_to_blacklist(token, expires_in)
+        await add_to_blacklist(payload.get("jti", token), expires_in)
 
     except Exception:
         pass
@@ -84,7 +84,7 @@ async def change_password(
     current_user: Annotated[User, Depends(get_current_user)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ):
-    auth_service.change_password(
+    await auth_service.change_password(
         user_id=current_user.id,
         current_password=password_data.current_password,
         new_password=password_data.new_password,
@@ -1,13 +1,32 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
-from app.core.deps import get_current_user, get_group_service
-from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.deps import get_current_member, get_current_user, get_group_service
+from app.core.exceptions import (
+    BadRequestException,
+    ForbiddenException,
+    NotFoundException,
+)
+from app.core.pagination import decode_message_cursor, decode_search_cursor
 from app.models.user import User
-from app.schemas.group import GroupCreate, GroupResponse, GroupUpdate
-from app.schemas.message import MessageCreate, MessageResponse
+from app.schemas.group import (
+    GroupCreate,
+    GroupResponse,
+    GroupSidebarItem,
+    GroupUpdate,
+)
+from app.schemas.message import (
+    MessageCreate,
+    MessagePage,
+    MessageResponse,
+    MessageSearchPage,
+    ReadMarkerUpdate,
+    ReadState,
+)
+from app.services.chat_service import Member, author_ids, publish_message
 from app.services.group_service import GroupService
+from app.services.websocket_service import manager
 
 router = APIRouter()
 
@@ -17,7 +36,15 @@ async def list_my_groups(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    return group_service.get_user_groups(current_user.id)
+    return await group_service.get_user_groups(current_user.id)
+
+
+@router.get("/sidebar", response_model=List[GroupSidebarItem])
+async def get_my_sidebar(
+    current_user: Annotated[User, Depends(get_current_user)],
+    group_service: Annotated[GroupService, Depends(get_group_service)],
+):
+    return await group_service.get_sidebar(current_user.id)
 
 
 @router.post("/", response_model=GroupResponse)
@@ -26,7 +53,7 @@ async def create_new_group(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    return group_service.create_group(group, current_user.id)
+    return await group_service.create_group(group, current_user.id)
 
 
 @router.get("/{group_id}", response_model=GroupResponse)
@@ -35,7 +62,7 @@ async def get_group_detail(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    group = group_service.get_group(group_id)
+    group = await group_service.get_group(group_id)
     if not group:
         raise NotFoundException("Group not found")
     return group
@@ -48,7 +75,7 @@ async def update_group_detail(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    return group_service.update_group(group_id, group_update, current_user.id)
+    return await group_service.update_group(group_id, group_update, current_user.id)
 
 
 @router.delete("/{group_id}")
@@ -57,7 +84,7 @@ async def delete_group_by_id(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    group_service.delete_group(group_id, current_user.id)
+    await group_service.delete_group(group_id, current_user.id)
     return {"message": "Group deleted successfully"}
 
 
@@ -67,7 +94,9 @@ async def join_group_by_id(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    return group_service.join_group(group_id, current_user.id)
+    group = await group_service.join_group(group_id, current_user.id)
+    await manager.notify_membership(current_user.id, group_id, joined=True)
+    return group
 
 
 @router.post("/{group_id}/leave")
@@ -76,35 +105,85 @@ async def leave_group_by_id(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    group_service.leave_group(group_id, current_user.id)
+    await group_service.leave_group(group_id, current_user.id)
+    await manager.notify_membership(current_user.id, group_id, joined=False)
     return {"message": "Left group successfully"}
 
 
+@router.post("/{group_id}/read", response_model=ReadState)
+async def mark_group_read(
+    group_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    group_service: Annotated[GroupService, Depends(get_group_service)],
+    marker: Optional[ReadMarkerUpdate] = None,
+):
+    message_id = marker.message_id if marker else None
+    return await group_service.mark_read(group_id, current_user.id, message_id)
+
+
 @router.post("/{group_id}/messages", response_model=MessageResponse)
 async def create_new_message(
     group_id: int,
     message: MessageCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_member: Annotated[Member, Depends(get_current_member)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    if not group_service.is_group_member(group_id, current_user.id):
+    if message.group_id != group_id:
+        raise BadRequestException("Message group does not match the URL")
+
+    if not await group_service.is_member(group_id, current_member):
         raise ForbiddenException("Not a member of this group")
 
-    return group_service.create_message(message, current_user.id)
+    db_message = await group_service.create_message(
+        message, **author_ids(current_member)
+    )
+    await publish_message(db_message, current_member)
+    return db_message
 
 
-@router.get("/{group_id}/messages", response_model=List[MessageResponse])
+@router.get("/{group_id}/messages", response_model=MessagePage)
 async def get_messages(
     group_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_member: Annotated[Member, Depends(get_current_member)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = Query(None, description="Cursor for older messages"),
+    after: Optional[str] = Query(None, description="Cursor for newer messages"),
+):
+    if before and after:
+        raise BadRequestException("Use either before or after, not both")
+
+    if not await group_service.is_member(group_id, current_member):
+        raise ForbiddenException("Not a member of this group")
+
+    if before is None and after is None:
+        page = await group_service.get_first_page(group_id, limit)
+        if page is not None:
+            return Response(page, media_type="application/json")
+
+    return await group_service.get_group_messages(
+        group_id,
+        limit,
+        before=decode_message_cursor(before) if before else None,
+        after=decode_message_cursor(after) if after else None,
+    )
+
+
+@router.get("/{group_id}/messages/search", response_model=MessageSearchPage)
+async def search_messages(
+    group_id: int,
+    current_member: Annotated[Member, Depends(get_current_member)],
+    group_service: Annotated[GroupService, Depends(get_group_service)],
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor for the next page"),
 ):
-    if not group_service.is_group_member(group_id, current_user.id):
+    if not await group_service.is_member(group_id, current_member):
         raise ForbiddenException("Not a member of this group")
 
-    return group_service.get_group_messages(group_id, skip, limit)
+    return await group_service.search_messages(
+        group_id, q, limit, after=decode_search_cursor(after) if after else None
+    )
 
 
 @router.delete("/messages/{message_id}")
@@ -113,5 +192,5 @@ async def delete_message_by_id(
     current_user: Annotated[User, Depends(get_current_user)],
     group_service: Annotated[GroupService, Depends(get_group_service)],
 ):
-    group_service.delete_message(message_id, current_user.id)
+    await group_service.delete_message(message_id, current_user.id)
     return {"message": "Message deleted successfully"}
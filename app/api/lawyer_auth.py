@@ -30,7 +30,7 @@ async def register(
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
     try:
-        return lawyer_service.create_lawyer(lawyer=lawyer)
+        return await lawyer_service.create_lawyer(lawyer=lawyer)
     except IntegrityError:
         raise ConflictException("Lawyername already registered")
 
@@ -40,7 +40,9 @@ async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    lawyer = lawyer_service.authenticate_lawyer(form_data.username, form_data.password)
+    lawyer = await lawyer_service.authenticate_lawyer(
+        form_data.username, form_data.password
+    )
     if not lawyer:
         raise UnauthorizedException("Incorrect lawyername or password")
 
@@ -68,7 +70,7 @@ async def logout(
             else settings.access_token_expire_minutes * 60
         )
 
-        await add_to_blacklist(token, expires_in)
+        await add_to_blacklist(payload.get("jti", token), expires_in)
 
     except Exception:
         pass
@@ -82,7 +84,7 @@ async def change_password(
     current_lawyer: Annotated[Lawyer, Depends(get_current_lawyer)],
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    lawyer_service.change_password(
+    await lawyer_service.change_password(
         lawyer_id=current_lawyer.id,
         current_password=password_data.current_password,
         new_password=password_data.new_password,
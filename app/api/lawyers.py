@@ -22,10 +22,12 @@ router = APIRouter()
 @router.get("/search", response_model=List[LawyerResponse])
 async def search_lawyers(
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
-    specialization: Optional[str] = Query(None, description="Filter lawyers by specialization (case type)"),
+    specialization: Optional[str] = Query(
+        None, description="Filter lawyers by specialization (case type)"
+    ),
 ):
     if specialization:
-        return lawyer_service.search_lawyers_by_specialization(specialization)
+        return await lawyer_service.search_lawyers_by_specialization(specialization)
     return []
 
 
@@ -40,7 +42,7 @@ async def update_me(
     current_lawyer: Annotated[Lawyer, Depends(get_current_lawyer)],
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    return lawyer_service.update_profile(current_lawyer.id, profile_update)
+    return await lawyer_service.update_profile(current_lawyer.id, profile_update)
 
 
 @router.get("/{lawyer_id}", response_model=LawyerResponse)
@@ -48,7 +50,7 @@ async def get_lawyer_by_lawyer_id(
     lawyer_id: str,
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    lawyer = lawyer_service.get_lawyer_by_lawyer_id(lawyer_id)
+    lawyer = await lawyer_service.get_lawyer_by_lawyer_id(lawyer_id)
     if not lawyer:
         raise NotFoundException("Lawyer not found")
     return lawyer
@@ -61,7 +63,9 @@ async def change_lawyername(
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
     try:
-        return lawyer_service.update_lawyer_id(current_lawyer.id, lawyer_id_update)
+        return await lawyer_service.update_lawyer_id(
+            current_lawyer.id, lawyer_id_update
+        )
     except IntegrityError:
         raise ConflictException("Lawyername already registered")
 
@@ -71,7 +75,7 @@ async def get_lawyer_reviews(
     lawyer_id: int,
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    return lawyer_service.get_lawyer_reviews(lawyer_id)
+    return await lawyer_service.get_lawyer_reviews(lawyer_id)
 
 
 @router.post("/{lawyer_id}/reviews", response_model=LawyerReviewResponse)
@@ -81,4 +85,4 @@ async def create_review(
     current_user: Annotated[User, Depends(get_current_user)],
     lawyer_service: Annotated[LawyerService, Depends(get_lawyer_service)],
 ):
-    return lawyer_service.create_review(review, lawyer_id, current_user.id)
+    return await lawyer_service.create_review(review, lawyer_id, current_user.id)
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.websocket import get_member_from_token, replay_missed_messages
+from app.core.exceptions import (
+    ForbiddenException,
+    ServiceUnavailableException,
+    UnauthorizedException,
+)
+from app.db.database import AsyncSessionLocal
+from app.services.group_service import GroupService
+from app.services.websocket_service import manager
+
+router = APIRouter()
+
+
+class EventStreamSink:
+    """Stands in for a WebSocket so an SSE response can join the manager.
+
+    The manager's writer task hands over already encoded events one at a
+    time, so a slow reader backs up into the connection's bounded queue and
+    is evicted like a slow socket.
+    """
+
+    def __init__(self):
+        self._events: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=1)
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        await self._events.put(payload)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(None)
+
+    async def next(self) -> Optional[str]:
+        return await self._events.get()
+
+
+@router.get("/{group_id}/stream")
+async def stream_group_messages(
+    group_id: int,
+    token: Annotated[Optional[str], Query()] = None,
+    authorization: Annotated[Optional[str], Header()] = None,
+    last_event_id: Annotated[Optional[str], Header()] = None,
+):
+    if manager.draining:
+        raise ServiceUnavailableException("Server is restarting")
+
+    # Query token for EventSource, which cannot set headers. The session is
+    # only held for the handshake, not for the life of the stream.
+    if token is None and authorization and authorization.startswith("Bearer "):
+        token = authorization.removeprefix("Bearer ")
+    if token is None:
+        raise UnauthorizedException("Not authenticated")
+    async with AsyncSessionLocal() as db:
+        member = await get_member_from_token(token, db)
+        if member is None:
+            raise UnauthorizedException("Could not validate credentials")
+        if not await GroupService(db).is_member(group_id, member):
+            raise ForbiddenException("Not a member of this group")
+
+    last_seen_id = (
+        int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    )
+
+    sink = EventStreamSink()
+    connection = await manager.connect(sink, group_id, encoding="sse")
+    if last_seen_id is not None:
+        await replay_missed_messages(connection, group_id, last_seen_id)
+
+    async def events():
+        try:
+            while True:
+                event = await sink.next()
+                if event is None:
+                    break
+                manager.touch(connection)
+                yield event
+        finally:
+            await manager.disconnect(connection)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -23,7 +23,7 @@ async def update_me(
     current_user: Annotated[User, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ):
-    return user_service.update_profile(current_user.id, profile_update)
+    return await user_service.update_profile(current_user.id, profile_update)
 
 
 @router.get("/{username}", response_model=UserResponse)
@@ -32,7 +32,7 @@ async def get_user_by_username(
     current_user: Annotated[User, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
 ):
-    user = user_service.get_user_by_username(username)
+    user = await user_service.get_user_by_username(username)
     if not user:
         raise NotFoundException("User not found")
     return user
@@ -45,6 +45,6 @@ async def change_username(
     user_service: Annotated[UserService, Depends(get_user_service)],
 ):
     try:
-        return user_service.update_username(current_user.id, username_update)
+        return await user_service.update_username(current_user.id, username_update)
     except IntegrityError:
         raise ConflictException("Username already registered")
@@ -1,75 +1,308 @@
 import json
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import AsyncSessionLocal
+from app.models.lawyer import Lawyer
 from app.models.user import User
 from app.schemas.message import MessageCreate
+from app.services.chat_service import (
+    Member,
+    author_ids,
+    member_key,
+    message_frame,
+    publish_message,
+)
 from app.services.group_service import GroupService
-from app.services.websocket_service import manager
+from app.services.message_buffer import recent_messages
+from app.services.message_writer import WriterBacklogFull, message_writer
+from app.services.presence_service import presence_service
+from app.services.principal_cache import lawyer_cache, user_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.revocation_service import is_token_revoked
+from app.services.websocket_service import Connection, manager
+from app.services.wire_format import ENCODINGS, decode, msgpack_available
 
 router = APIRouter()
 
 
-async def get_user_from_token(token: str, db: Session) -> User:
+async def get_member_from_token(token: str, db: AsyncSession) -> Optional[Member]:
+    """Resolve a user ("normal") or lawyer token, or None if it is not valid."""
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
-        user_id: int = payload.get("sub")
-        if user_id is None:
+        member_id: int = payload.get("sub")
+        token_type = payload.get("type")
+        if member_id is None or token_type not in ("normal", "lawyer"):
             return None
     except JWTError:
         return None
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    return user
+    if await is_token_revoked(token, payload):
+        return None
 
+    model, cache = (
+        (Lawyer, lawyer_cache) if token_type == "lawyer" else (User, user_cache)
+    )
+    member = await cache.get(int(member_id))
+    if member is None:
+        member = await db.get(model, int(member_id))
+        if member is not None:
+            await cache.set(member)
+    return member
 
-@router.websocket("/{group_id}")
-async def websocket_endpoint(
+
+async def replay_missed_messages(
+    connection: Connection, group_id: int, last_seen_id: int
+) -> None:
+    # Live broadcasts are already flowing, so clients should drop duplicate ids
+    payloads = await recent_messages.since(group_id, last_seen_id)
+    truncated = False
+    if payloads is None:
+        async with AsyncSessionLocal() as db:
+            rows = await GroupService(db).get_messages_since(
+                group_id, last_seen_id, settings.replay_max_messages + 1
+            )
+        truncated = len(rows) > settings.replay_max_messages
+        payloads = [
+            json.dumps(message_frame(message, author))
+            for message, author in rows[: settings.replay_max_messages]
+        ]
+
+    for payload in payloads:
+        await manager.send_payload(connection, payload)
+    await manager.send(
+        connection,
+        {"type": "replay_complete", "group_id": group_id, "truncated": truncated},
+    )
+
+
+def error_frame(code: str, detail: str, group_id: Optional[int] = None) -> dict:
+    return {"type": "error", "code": code, "group_id": group_id, "detail": detail}
+
+
+async def reject_frame(
+    connection: Connection, code: str, detail: str, group_id: Optional[int] = None
+) -> None:
+    connection.violations += 1
+    if connection.violations > settings.websocket_max_violations:
+        await manager.disconnect(connection)
+        await connection.websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Too many rejected frames"
+        )
+        raise WebSocketDisconnect(code=status.WS_1008_POLICY_VIOLATION)
+    await manager.send(connection, error_frame(code, detail, group_id))
+
+
+async def check_handshake(websocket: WebSocket, encoding: str) -> bool:
+    if manager.draining:
+        await websocket.close(code=status.WS_1012_SERVICE_RESTART)
+        return False
+    if encoding in ENCODINGS and (encoding != "msgpack" or msgpack_available()):
+        return True
+    await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+    return False
+
+
+async def receive_frame(connection: Connection, member: Member) -> Optional[dict]:
+    """Read the next frame, or return None if it was rejected or a pong."""
+    message = await connection.websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    manager.touch(connection)
+
+    data = message.get("text")
+    if data is None:
+        data = message.get("bytes") or b""
+    size = len(data.encode()) if isinstance(data, str) else len(data)
+    if size > settings.websocket_max_frame_size:
+        await reject_frame(
+            connection,
+            "frame_too_large",
+            f"Frames are limited to {settings.websocket_max_frame_size} bytes",
+        )
+        return None
+
+    try:
+        if isinstance(data, str):
+            message_data = json.loads(data)
+        else:
+            message_data = decode(data, connection.encoding)
+    except ValueError:
+        message_data = None
+    if not isinstance(message_data, dict):
+        await reject_frame(
+            connection, "invalid_frame", "Frames must be JSON or msgpack maps"
+        )
+        return None
+
+    # Pongs are limited too, or a client could flood them for free; one per
+    # ping barely dents the budget
+    if not await rate_limiter.allow(member_key(member)):
+        await reject_frame(connection, "rate_limited", "Too many frames, slow down")
+        return None
+
+    if message_data.get("type") == "pong":
+        return None
+
+    return message_data
+
+
+async def handle_frame(
+    connection: Connection, member: Member, group_id: int, message_data: dict
+) -> None:
+    frame_type = message_data.get("type", "message")
+
+    if frame_type == "typing":
+        presence_service.typing(group_id, member_key(member))
+        return
+
+    if frame_type == "replay":
+        last_seen_id = message_data.get("last_seen_id")
+        if isinstance(last_seen_id, int):
+            await replay_missed_messages(connection, group_id, last_seen_id)
+        return
+
+    try:
+        message_create = MessageCreate(
+            content=message_data.get("content"), group_id=group_id
+        )
+    except ValidationError:
+        await reject_frame(
+            connection, "invalid_message", "Message content is required", group_id
+        )
+        return
+
+    try:
+        db_message = await message_writer.submit(message_create, **author_ids(member))
+    except WriterBacklogFull:
+        # Not the client's fault, so not counted as a violation
+        await manager.send(
+            connection,
+            error_frame(
+                "unavailable", "Messages cannot be saved right now, retry", group_id
+            ),
+        )
+        return
+    await publish_message(db_message, member)
+
+
+async def join_channel(connection: Connection, member: Member, group_id: int) -> None:
+    await presence_service.join(group_id, member_key(member))
+    await manager.send(connection, await presence_service.snapshot(group_id))
+
+
+async def release(connection: Connection, member: Member) -> None:
+    # Runs on every exit path, including evictions by the writer or the idle
+    # reaper (which already disconnected the socket) and handler errors.
+    await manager.disconnect(connection)
+    for group_id in connection.channels:
+        await presence_service.leave(group_id, member_key(member))
+
+
+@router.websocket("")
+async def multiplexed_websocket_endpoint(
     websocket: WebSocket,
-    group_id: int,
     token: Annotated[str, Query(...)],
-    db: Annotated[Session, Depends(get_db)],
+    encoding: Annotated[str, Query()] = "json",
 ):
-    user = await get_user_from_token(token, db)
-    if not user:
-        await websocket.close(code=1008)
+    if not await check_handshake(websocket, encoding):
         return
 
-    group_service = GroupService(db)
-    if not group_service.is_group_member(group_id, user.id):
+    # One socket per member: authenticate once and subscribe to every group
+    # the member belongs to. Frames carry a group_id envelope in both
+    # directions, and a user's joins/leaves are applied live through their
+    # control channel.
+    async with AsyncSessionLocal() as db:
+        member = await get_member_from_token(token, db)
+        group_ids = (
+            await GroupService(db).get_member_group_ids(member) if member else []
+        )
+    if member is None:
         await websocket.close(code=1008)
         return
 
-    await manager.connect(websocket, group_id)
-
+    is_user = isinstance(member, User)
+    connection = await manager.accept(
+        websocket,
+        member.id if is_user else None,
+        follow_membership=is_user,
+        encoding=encoding,
+    )
     try:
+        for group_id in group_ids:
+            await manager.subscribe(connection, group_id)
+            await join_channel(connection, member, group_id)
+
         while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = await receive_frame(connection, member)
+            if message_data is None:
+                continue
 
-            message_create = MessageCreate(
-                content=message_data.get("content"), group_id=group_id
-            )
+            group_id = message_data.get("group_id")
+            if not isinstance(group_id, int) or isinstance(group_id, bool):
+                await reject_frame(
+                    connection, "invalid_frame", "group_id must be an integer"
+                )
+                continue
+            if group_id not in connection.channels:
+                await reject_frame(
+                    connection, "not_member", "Not a member of this group", group_id
+                )
+                continue
 
-            db_message = group_service.create_message(message_create, user.id)
+            await handle_frame(connection, member, group_id, message_data)
 
-            response = {
-                "id": db_message.id,
-                "content": db_message.content,
-                "author_id": user.id,
-                "author_username": user.username,
-                "author_display_name": user.display_name or user.username,
-                "created_at": db_message.created_at.isoformat(),
-            }
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await release(connection, member)
+
+
+@router.websocket("/{group_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    group_id: int,
+    token: Annotated[str, Query(...)],
+    last_seen_id: Annotated[Optional[int], Query()] = None,
+    encoding: Annotated[str, Query()] = "json",
+):
+    if not await check_handshake(websocket, encoding):
+        return
+
+    # The socket can stay open for hours, so it must not hold a pooled
+    # connection: check out a session for the handshake only. Messages are
+    # persisted by the write-behind writer, which uses its own sessions.
+    async with AsyncSessionLocal() as db:
+        member = await get_member_from_token(token, db)
+        is_member = member is not None and await GroupService(db).is_member(
+            group_id, member
+        )
+    if not is_member:
+        await websocket.close(code=1008)
+        return
+
+    user_id = member.id if isinstance(member, User) else None
+    connection = await manager.connect(websocket, group_id, user_id, encoding)
+    try:
+        await join_channel(connection, member, group_id)
+        if last_seen_id is not None:
+            await replay_missed_messages(connection, group_id, last_seen_id)
+
+        while True:
+            message_data = await receive_frame(connection, member)
+            if message_data is None:
+                continue
 
-            await manager.broadcast(json.dumps(response), group_id)
+            await handle_frame(connection, member, group_id, message_data)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, group_id)
+        pass
+    finally:
+        await release(connection, member)
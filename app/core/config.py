@@ -5,10 +5,58 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
     redis_url: str
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    metrics_token: str = ""
+    metrics_allowed_hosts: str = "127.0.0.1,::1"
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 60
+    principal_cache_redis: bool = False
+    membership_cache_enabled: bool = False
+    membership_cache_ttl: int = 300
+    broker_backend: str = "local"
+    broker_channel_prefix: str = "ws:"
+    websocket_send_queue_size: int = 100
+    websocket_send_timeout: float = 5.0
+    websocket_ping_interval: int = 20
+    websocket_idle_timeout: int = 60
+    websocket_rate_limit: float = 5.0
+    websocket_rate_burst: int = 20
+    websocket_rate_limit_redis: bool = False
+    # Local buckets kept per worker; size it to the members a worker may
+    # have connected at once
+    websocket_rate_limit_cache_size: int = 100000
+    websocket_max_frame_size: int = 16384
+    websocket_max_violations: int = 10
+    shutdown_drain_timeout: float = 10.0
+    shutdown_reconnect_jitter: float = 10.0
+    message_flush_interval_ms: int = 50
+    message_flush_batch_size: int = 500
+    message_writer_max_pending: int = 10000
+    message_id_block_size: int = 100
+    # Load tests only: on databases without the group_messages sequence, hand
+    # out ids counting up from the highest stored id. Safe only while one
+    # worker's writer is the only thing inserting messages; autoincrement
+    # inserts from the REST endpoint would collide with its reserved ids.
+    message_writer_local_ids: bool = False
+    presence_ttl: int = 60
+    presence_heartbeat_interval: int = 20
+    presence_flush_interval_ms: int = 500
+    typing_ttl: int = 5
+    recent_buffer_size: int = 200
+    replay_max_messages: int = 500
+    message_page_cache_size: int = 100
+    message_search_config: str = "simple"
+    message_search_mode: str = "auto"
+    message_partition_months_ahead: int = 3
+    message_retention_months: int = 24
 
     model_config = SettingsConfigDict(
         env_file=".env.local" if os.path.exists(".env.local") else ".env"
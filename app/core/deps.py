@@ -1,47 +1,46 @@
-from typing import Annotated
+import secrets
+from typing import Annotated, Optional, Union
 
-from fastapi import Depends
+from fastapi import Depends, Header, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.exceptions import UnauthorizedException
+from app.core.exceptions import ForbiddenException, UnauthorizedException
 from app.db.database import get_db
-from app.db.redis import is_blacklisted
 from app.models.lawyer import Lawyer
 from app.models.user import User
 from app.services.auth_service import AuthService
 from app.services.group_service import GroupService
 from app.services.lawyer_service import LawyerService
+from app.services.principal_cache import lawyer_cache, user_cache
+from app.services.revocation_service import is_token_revoked
 from app.services.user_service import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 oauth2_scheme_lawyer = OAuth2PasswordBearer(tokenUrl="/api/lawyer-auth/login")
 
 
-def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
     return AuthService(db)
 
 
-def get_user_service(db: Session = Depends(get_db)) -> UserService:
+def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(db)
 
 
-def get_group_service(db: Session = Depends(get_db)) -> GroupService:
+def get_group_service(db: AsyncSession = Depends(get_db)) -> GroupService:
     return GroupService(db)
 
 
-def get_lawyer_service(db: Session = Depends(get_db)) -> LawyerService:
+def get_lawyer_service(db: AsyncSession = Depends(get_db)) -> LawyerService:
     return LawyerService(db)
 
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)
+    token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)
 ) -> User:
-    if await is_blacklisted(token):
-        raise UnauthorizedException("Token has been revoked")
-
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -53,18 +52,24 @@ async def get_current_user(
     except JWTError:
         raise UnauthorizedException("Invalid authentication credentials")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    if await is_token_revoked(token, payload):
+        raise UnauthorizedException("Token has been revoked")
+
+    user = await user_cache.get(int(user_id))
+    if user is not None:
+        return user
+
+    user = await db.get(User, int(user_id))
     if user is None:
         raise UnauthorizedException("User not found")
+    await user_cache.set(user)
     return user
 
 
 async def get_current_lawyer(
-    token: Annotated[str, Depends(oauth2_scheme_lawyer)], db: Session = Depends(get_db)
+    token: Annotated[str, Depends(oauth2_scheme_lawyer)],
+    db: AsyncSession = Depends(get_db),
 ) -> Lawyer:
-    if await is_blacklisted(token):
-        raise UnauthorizedException("Token has been revoked")
-
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -76,7 +81,49 @@ async def get_current_lawyer(
     except JWTError:
         raise UnauthorizedException("Invalid authentication credentials")
 
-    lawyer = db.query(Lawyer).filter(Lawyer.id == int(lawyer_id)).first()
+    if await is_token_revoked(token, payload):
+        raise UnauthorizedException("Token has been revoked")
+
+    lawyer = await lawyer_cache.get(int(lawyer_id))
+    if lawyer is not None:
+        return lawyer
+
+    lawyer = await db.get(Lawyer, int(lawyer_id))
     if lawyer is None:
         raise UnauthorizedException("Lawyer not found")
+    await lawyer_cache.set(lawyer)
     return lawyer
+
+
+async def get_current_member(
+    token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)
+) -> Union[User, Lawyer]:
+    """A user or a lawyer, for group endpoints open to members of both kinds."""
+    try:
+        token_type = jwt.get_unverified_claims(token).get("type")
+    except JWTError:
+        raise UnauthorizedException("Invalid authentication credentials")
+
+    # Only picks the loader; each of them verifies the token in full
+    if token_type == "lawyer":
+        return await get_current_lawyer(token, db)
+    return await get_current_user(token, db)
+
+
+def require_metrics_access(
+    request: Request, authorization: Annotated[Optional[str], Header()] = None
+) -> None:
+    """Only let scrapers read /metrics.
+
+    A scraper presents METRICS_TOKEN as a bearer token or connects from one
+    of METRICS_ALLOWED_HOSTS, which defaults to loopback for local load
+    tests.
+    """
+    if settings.metrics_token and authorization:
+        presented = authorization.removeprefix("Bearer ")
+        if secrets.compare_digest(presented, settings.metrics_token):
+            return
+    allowed = {host.strip() for host in settings.metrics_allowed_hosts.split(",")}
+    if request.client is not None and request.client.host in allowed:
+        return
+    raise ForbiddenException("Metrics are not public")
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+hash_wait_seconds = Histogram(
+    "password_hash_wait_seconds",
+    "Time a password hashing job waited for a pool worker",
+)
+hash_run_seconds = Histogram(
+    "password_hash_run_seconds", "Time a pool worker spent on a bcrypt call"
+)
+hash_in_flight = Gauge(
+    "password_hash_in_flight", "Password hashing jobs queued or running"
+)
+hash_rejected = Counter(
+    "password_hash_rejected_total", "Password hashing jobs rejected by the pool"
+)
+
+
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+    except ValueError:
+        return False
+
+
+def _timed(func: Callable[..., T], *args) -> Tuple[float, float, T]:
+    # time.monotonic is system-wide, so it is comparable across processes
+    started = time.monotonic()
+    result = func(*args)
+    return started, time.monotonic(), result
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded worker pool."""
+
+    def __init__(self, executor_type: str, max_workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            hash_rejected.inc(operation=operation)
+            raise ServiceUnavailableException(
+                "Too many authentication requests, please retry shortly"
+            )
+
+        self._pending += 1
+        hash_in_flight.inc()
+        submitted = time.monotonic()
+        try:
+            (
+                started,
+                finished,
+                result,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _timed, func, *args
+            )
+        finally:
+            self._pending -= 1
+            hash_in_flight.dec()
+
+        hash_wait_seconds.observe(started - submitted, operation=operation)
+        hash_run_seconds.observe(finished - started, operation=operation)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify", _check_password, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.password_hash_executor,
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
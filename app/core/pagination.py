@@ -0,0 +1,43 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from app.core.exceptions import BadRequestException
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(values, list):
+        raise BadRequestException("Invalid cursor")
+    return values
+
+
+def decode_message_cursor(cursor: str) -> tuple[datetime, int]:
+    values = decode_cursor(cursor)
+    try:
+        created_at, message_id = values
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, datetime, int]:
+    values = decode_cursor(cursor)
+    try:
+        rank, created_at, message_id = values
+        return float(rank), datetime.fromisoformat(created_at), int(message_id)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid cursor")
@@ -1,3 +1,4 @@
+import json
 from datetime import timedelta
 
 import redis.asyncio as redis
@@ -6,6 +7,8 @@ from app.core.config import settings
 
 redis_client = None
 
+REVOCATION_CHANNEL = "blacklist"
+
 
 async def get_redis():
     global redis_client
@@ -36,12 +39,15 @@ async def close_redis():
         redis_client = None
 
 
-async def add_to_blacklist(token: str, expires_in: int):
+async def add_to_blacklist(token_id: str, expires_in: int):
     client = await get_redis()
-    await client.setex(f"blacklist:{token}", timedelta(seconds=expires_in), "1")
+    await client.setex(f"blacklist:{token_id}", timedelta(seconds=expires_in), "1")
+    await client.publish(
+        REVOCATION_CHANNEL, json.dumps({"jti": token_id, "expires_in": expires_in})
+    )
 
 
-async def is_blacklisted(token: str) -> bool:
+async def is_blacklisted(token_id: str) -> bool:
     client = await get_redis()
-    result = await client.exists(f"blacklist:{token}")
+    result = await client.exists(f"blacklist:{token_id}")
     return result > 0
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -42,6 +42,11 @@ class Group(Base):
 
 class GroupMessage(Base):
     __tablename__ = "group_messages"
+    __table_args__ = (
+        Index(
+            "ix_group_messages_group_id_created_at_id", "group_id", "created_at", "id"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
@@ -54,8 +59,12 @@ class GroupMessage(Base):
     lawyer_author_id = Column(
         Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=True
     )
+    # Partition key on Postgres, where the primary key is (id, created_at);
+    # ids are still unique, so the mapping keeps id as the identity
     created_at = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
     )
     updated_at = Column(
         DateTime(timezone=True),
@@ -1,6 +1,15 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -11,6 +20,8 @@ lawyer_groups = Table(
     Base.metadata,
     Column("lawyer_id", Integer, ForeignKey("lawyers.id", ondelete="CASCADE")),
     Column("group_id", Integer, ForeignKey("groups.id", ondelete="CASCADE")),
+    PrimaryKeyConstraint("group_id", "lawyer_id", name="lawyer_groups_pkey"),
+    Index("ix_lawyer_groups_lawyer_id", "lawyer_id"),
 )
 
 
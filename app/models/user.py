@@ -1,6 +1,15 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -10,6 +19,12 @@ user_groups = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE")),
     Column("group_id", Integer, ForeignKey("groups.id", ondelete="CASCADE")),
+    # Read marker: the (created_at, id) key of the last message read. No
+    # foreign key, so deleting that message does not touch the membership.
+    Column("last_read_message_id", Integer, nullable=True),
+    Column("last_read_at", DateTime(timezone=True), nullable=True),
+    PrimaryKeyConstraint("group_id", "user_id", name="user_groups_pkey"),
+    Index("ix_user_groups_user_id", "user_id"),
 )
 
 
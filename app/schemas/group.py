@@ -3,6 +3,8 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
+from app.schemas.message import MessagePreview
+
 
 class GroupBase(BaseModel):
     name: str
@@ -31,3 +33,8 @@ class GroupResponse(GroupBase):
 
 class GroupWithMembers(GroupResponse):
     member_count: int
+
+
+class GroupSidebarItem(GroupWithMembers):
+    last_message: Optional[MessagePreview] = None
+    unread_count: int
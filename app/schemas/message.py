@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -14,7 +15,8 @@ class MessageCreate(MessageBase):
 class MessageResponse(MessageBase):
     id: int
     group_id: int
-    author_id: int
+    author_id: Optional[int] = None
+    lawyer_author_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -25,3 +27,36 @@ class MessageWithAuthor(MessageResponse):
     author_username: str
     author_display_name: str
     author_avatar_url: str
+
+
+class MessagePage(BaseModel):
+    items: List[MessageResponse]
+    next_cursor: Optional[str] = None
+
+
+class MessageSearchResult(MessageResponse):
+    rank: float
+
+
+class MessageSearchPage(BaseModel):
+    items: List[MessageSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class MessagePreview(BaseModel):
+    id: int
+    content: str
+    author_type: str
+    author_id: Optional[int] = None
+    author_display_name: Optional[str] = None
+    created_at: datetime
+
+
+class ReadMarkerUpdate(BaseModel):
+    message_id: Optional[int] = None
+
+
+class ReadState(BaseModel):
+    group_id: int
+    last_read_message_id: Optional[int] = None
+    unread_count: int
@@ -1,33 +1,28 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from uuid import uuid4
 
-import bcrypt
 from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.exceptions import UnauthorizedException
+from app.core.hashing import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.services.principal_cache import user_cache
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        try:
-            return bcrypt.checkpw(
-                plain_password.encode("utf-8"), hashed_password.encode("utf-8")
-            )
-        except ValueError:
-            return False
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        pwd_bytes = password.encode("utf-8")
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(pwd_bytes, salt)
-        return hashed_password.decode("utf-8")
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
@@ -37,22 +32,22 @@ class AuthService:
             expire = datetime.now(timezone.utc) + expires_delta
         else:
             expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "jti": uuid4().hex})
         encoded_jwt = jwt.encode(
             to_encode, settings.secret_key, algorithm=settings.algorithm
         )
         return encoded_jwt
 
-    def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        user = self.db.query(User).filter(User.username == username).first()
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        user = await self.db.scalar(select(User).where(User.username == username))
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password(password, user.hashed_password):
             return None
         return user
 
-    def create_user(self, user: UserCreate) -> User:
-        hashed_password = self.get_password_hash(user.password)
+    async def create_user(self, user: UserCreate) -> User:
+        hashed_password = await self.get_password_hash(user.password)
         db_user = User(
             username=user.username,
             hashed_password=hashed_password,
@@ -61,21 +56,22 @@ class AuthService:
             avatar_url=user.avatar_url,
         )
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         return db_user
 
-    def change_password(
+    async def change_password(
         self, user_id: int, current_password: str, new_password: str
     ) -> bool:
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.db.get(User, user_id)
         if not user:
             raise UnauthorizedException("User not found")
 
-        if not self.verify_password(current_password, user.hashed_password):
+        if not await self.verify_password(current_password, user.hashed_password):
             raise UnauthorizedException("Current password is incorrect")
 
-        user.hashed_password = self.get_password_hash(new_password)
+        user.hashed_password = await self.get_password_hash(new_password)
 
-        self.db.commit()
+        await self.db.commit()
+        await user_cache.invalidate(user_id)
         return True
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional, Set
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+RESUBSCRIBE_DELAY_SECONDS = 1
+
+
+class Broker(ABC):
+    """Fan-out transport between workers.
+
+    Every published payload is handed to the handler of each worker that is
+    subscribed to the channel, including the publishing worker itself. The
+    base class keeps the handler and the subscribed channels; transports
+    extend those methods and implement ``publish``.
+    """
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+        self._channels: Set[str] = set()
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._channels.clear()
+
+    async def subscribe(self, channel: str) -> None:
+        self._channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._channels.discard(channel)
+
+    @abstractmethod
+    async def publish(self, channel: str, payload: str) -> None:
+        """Deliver ``payload`` to every worker subscribed to ``channel``."""
+
+
+class LocalBroker(Broker):
+    """Delivers within the current process only; for tests and single workers."""
+
+    async def publish(self, channel: str, payload: str) -> None:
+        if channel in self._channels and self._handler is not None:
+            await self._handler(channel, payload)
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub: one PUBLISH per message, every worker reads its copy."""
+
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._has_channels = asyncio.Event()
+
+    async def start(self, handler: MessageHandler) -> None:
+        await super().start(handler)
+        client = await get_redis()
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await super().stop()
+
+    async def subscribe(self, channel: str) -> None:
+        await super().subscribe(channel)
+        await self._pubsub.subscribe(self.prefix + channel)
+        self._has_channels.set()
+
+    async def unsubscribe(self, channel: str) -> None:
+        await super().unsubscribe(channel)
+        await self._pubsub.unsubscribe(self.prefix + channel)
+        if not self._channels:
+            self._has_channels.clear()
+
+    async def publish(self, channel: str, payload: str) -> None:
+        client = await get_redis()
+        await client.publish(self.prefix + channel, payload)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                # get_message needs at least one subscription to read from
+                await self._has_channels.wait()
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None or message["type"] != "message":
+                    continue
+                channel = message["channel"].removeprefix(self.prefix)
+                await self._handler(channel, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker listener failed, resubscribing")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+                await self._resubscribe()
+
+    async def _resubscribe(self) -> None:
+        try:
+            await self._pubsub.aclose()
+            client = await get_redis()
+            self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+            if self._channels:
+                await self._pubsub.subscribe(
+                    *(self.prefix + channel for channel in self._channels)
+                )
+        except Exception:
+            logger.exception("Could not resubscribe broker channels")
+
+
+def create_broker() -> Broker:
+    if settings.broker_backend == "redis":
+        return RedisBroker(prefix=settings.broker_channel_prefix)
+    return LocalBroker()
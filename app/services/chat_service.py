@@ -0,0 +1,56 @@
+import json
+from typing import Union
+
+from app.models.group import GroupMessage
+from app.models.lawyer import Lawyer
+from app.models.user import User
+from app.services.message_buffer import recent_messages
+from app.services.unread_service import unread_counters
+from app.services.websocket_service import manager
+
+Member = Union[User, Lawyer]
+
+
+def member_key(member: Member) -> Union[int, str]:
+    """Presence and rate-limit key; lawyer ids share a range with user ids."""
+    if isinstance(member, Lawyer):
+        return f"lawyer:{member.id}"
+    return member.id
+
+
+def author_ids(member: Member) -> dict:
+    if isinstance(member, Lawyer):
+        return {"author_id": None, "lawyer_author_id": member.id}
+    return {"author_id": member.id, "lawyer_author_id": None}
+
+
+def message_frame(message: GroupMessage, author: Member) -> dict:
+    if isinstance(author, Lawyer):
+        author_type = "lawyer"
+        username = author.lawyer_id
+        display_name = author.lawyer_name or author.lawyer_id
+    else:
+        author_type = "user"
+        username = author.username
+        display_name = author.display_name or author.username
+    return {
+        "type": "message",
+        "group_id": message.group_id,
+        "id": message.id,
+        "content": message.content,
+        "author_type": author_type,
+        "author_id": author.id,
+        "author_username": username,
+        "author_display_name": display_name,
+        "created_at": message.created_at.isoformat(),
+    }
+
+
+async def publish_message(message: GroupMessage, author: Member) -> dict:
+    """Fan a newly created message out to sockets and the replay buffer."""
+    frame = message_frame(message, author)
+    payload = json.dumps(frame)
+    await recent_messages.append(message.group_id, message.id, payload)
+    await unread_counters.on_message(message.group_id, message.author_id)
+    await manager.publish(payload, message.group_id)
+    return frame
@@ -1,19 +1,57 @@
-from typing import List, Optional
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.config import settings
 from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.pagination import encode_cursor
 from app.models.group import Group, GroupMessage
-from app.models.user import User
+from app.models.lawyer import Lawyer, lawyer_groups
+from app.models.user import User, user_groups
 from app.schemas.group import GroupCreate, GroupUpdate
-from app.schemas.message import MessageCreate
+from app.schemas.message import MessageCreate, MessageResponse, MessageSearchResult
+from app.services.membership_cache import membership_cache
+from app.services.message_buffer import recent_messages
+from app.services.message_page_cache import first_page_cache
+from app.services.message_writer import message_writer
+from app.services.unread_service import unread_counters
+
+# Characters of the last message included in the sidebar
+PREVIEW_LENGTH = 200
+
+# Generated from content by the search migration; not mapped on the model so
+# SQLite tooling can still create_all
+CONTENT_TSV = literal_column("group_messages.content_tsv", TSVECTOR)
+
+HANGUL = re.compile("[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]")
 
 
 class GroupService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_group(self, group: GroupCreate, owner_id: int) -> Group:
+    async def create_group(self, group: GroupCreate, owner_id: int) -> Group:
+        owner = await self.db.get(User, owner_id)
+        if not owner:
+            raise NotFoundException("Owner user not found")
+
         db_group = Group(
             name=group.name,
             description=group.description,
@@ -21,31 +59,236 @@ class GroupService:
             owner_id=owner_id,
         )
         self.db.add(db_group)
-        self.db.commit()
-        self.db.refresh(db_group)
+        await self.db.flush()
 
-        owner = self.db.query(User).filter(User.id == owner_id).first()
-        if not owner:
-            raise NotFoundException("Owner user not found")
-        db_group.members.append(owner)
-        self.db.commit()             
-        self.db.refresh(db_group)
+        await self.db.execute(
+            insert(user_groups).values(group_id=db_group.id, user_id=owner_id)
+        )
+        await self.db.commit()
+        await self.db.refresh(db_group)
+        await membership_cache.add(db_group.id, owner_id)
 
         return db_group
 
-    def get_group(self, group_id: int) -> Optional[Group]:
-        return self.db.query(Group).filter(Group.id == group_id).first()
+    async def get_group(self, group_id: int) -> Optional[Group]:
+        return await self.db.get(Group, group_id)
+
+    async def get_user_groups(self, user_id: int) -> List[Group]:
+        result = await self.db.scalars(
+            select(Group)
+            .join(user_groups, user_groups.c.group_id == Group.id)
+            .where(user_groups.c.user_id == user_id)
+        )
+        return list(result)
+
+    async def get_sidebar(self, user_id: int) -> List[dict]:
+        """The user's groups with member count, last message and unread count.
+
+        One round trip: per group, the member count is an index-only count on
+        the user_groups key and the last message is a one-row backward scan of
+        ix_group_messages_group_id_created_at_id. Unread counts come from the
+        Redis counters; groups without one yet are counted in the database
+        once and seeded. Most recent activity first.
+        """
+        members = user_groups.alias("members")
+        member_count = (
+            select(func.count())
+            .select_from(members)
+            .where(members.c.group_id == Group.id)
+            .correlate(Group)
+            .scalar_subquery()
+        )
+        last_message_id = (
+            select(GroupMessage.id)
+            .where(GroupMessage.group_id == Group.id)
+            .order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+            .limit(1)
+            .correlate(Group)
+            .scalar_subquery()
+        )
+        last_message = aliased(GroupMessage, name="last_message")
+
+        query = (
+            select(
+                Group,
+                member_count.label("member_count"),
+                last_message.id.label("message_id"),
+                func.substr(last_message.content, 1, PREVIEW_LENGTH).label("preview"),
+                last_message.created_at.label("sent_at"),
+                last_message.author_id,
+                last_message.lawyer_author_id,
+                func.coalesce(User.display_name, User.username).label("user_name"),
+                func.coalesce(Lawyer.lawyer_name, Lawyer.lawyer_id).label(
+                    "lawyer_name"
+                ),
+            )
+            .select_from(user_groups)
+            .join(Group, Group.id == user_groups.c.group_id)
+            .outerjoin(last_message, last_message.id == last_message_id)
+            .outerjoin(User, User.id == last_message.author_id)
+            .outerjoin(Lawyer, Lawyer.id == last_message.lawyer_author_id)
+            .where(user_groups.c.user_id == user_id)
+            .order_by(func.coalesce(last_message.created_at, Group.created_at).desc())
+        )
+
+        sidebar = []
+        for row in await self.db.execute(query):
+            group = row.Group
+            item = {
+                "id": group.id,
+                "name": group.name,
+                "description": group.description,
+                "icon_url": group.icon_url,
+                "owner_id": group.owner_id,
+                "created_at": group.created_at,
+                "updated_at": group.updated_at,
+                "member_count": row.member_count,
+                "unread_count": 0,
+                "last_message": None,
+            }
+            if row.message_id is not None:
+                is_lawyer = row.lawyer_author_id is not None
+                item["last_message"] = {
+                    "id": row.message_id,
+                    "content": row.preview,
+                    "author_type": "lawyer" if is_lawyer else "user",
+                    "author_id": row.lawyer_author_id if is_lawyer else row.author_id,
+                    "author_display_name": (
+                        row.lawyer_name if is_lawyer else row.user_name
+                    ),
+                    "created_at": row.sent_at,
+                }
+            sidebar.append(item)
+
+        counts = await unread_counters.counts(user_id, (g["id"] for g in sidebar))
+        missing = [group_id for group_id, count in counts.items() if count is None]
+        if missing:
+            # First badge for these groups: count once in the DB, then the
+            # counters are maintained incrementally
+            seeded = await self.count_unread(user_id, missing)
+            await unread_counters.set_unread(user_id, seeded)
+            counts.update(seeded)
+        for item in sidebar:
+            item["unread_count"] = counts[item["id"]]
+        return sidebar
+
+    async def count_unread(self, user_id: int, group_ids: List[int]) -> Dict[int, int]:
+        """Messages after the user's read marker, per group, from the database.
+
+        The source of truth for the Redis counters; used to seed them and by
+        the reconciliation job. Own messages are never unread.
+        """
+        query = (
+            select(GroupMessage.group_id, func.count())
+            .select_from(user_groups)
+            .join(
+                GroupMessage,
+                and_(
+                    GroupMessage.group_id == user_groups.c.group_id,
+                    GroupMessage.author_id.is_distinct_from(user_groups.c.user_id),
+                    or_(
+                        user_groups.c.last_read_at.is_(None),
+                        tuple_(GroupMessage.created_at, GroupMessage.id)
+                        > tuple_(
+                            user_groups.c.last_read_at,
+                            user_groups.c.last_read_message_id,
+                        ),
+                    ),
+                ),
+            )
+            .where(
+                user_groups.c.user_id == user_id,
+                user_groups.c.group_id.in_(group_ids),
+            )
+            .group_by(GroupMessage.group_id)
+        )
+        counts = dict.fromkeys(group_ids, 0)
+        counts.update((await self.db.execute(query)).tuples().all())
+        return counts
+
+    async def mark_read(
+        self, group_id: int, user_id: int, message_id: Optional[int] = None
+    ) -> dict:
+        """Advance the read marker to ``message_id``, or to the latest message.
+
+        Markers only move forward, so a stale client cannot mark messages
+        unread again. Recently published messages are resolved from the
+        replay buffer, since they may still be waiting in a worker's
+        write-behind writer, and counted against the same sequence as the
+        Redis counters.
+        """
+        if not await self.is_group_member(group_id, user_id):
+            raise ForbiddenException("Not a member of this group")
+
+        unread = None
+        recent = await unread_counters.mark_read(user_id, group_id, message_id)
+        if recent is not None:
+            frame, unread = recent
+            target = (frame["id"], datetime.fromisoformat(frame["created_at"]))
+        else:
+            # Older than the buffer, or the buffer was cleared; stored unless
+            # still queued in this worker
+            await message_writer.flush()
+            if message_id is not None:
+                message = await self.db.get(GroupMessage, message_id)
+                if message is None or message.group_id != group_id:
+                    raise NotFoundException("Message not found")
+            else:
+                message = await self.db.scalar(
+                    select(GroupMessage)
+                    .where(GroupMessage.group_id == group_id)
+                    .order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+                    .limit(1)
+                )
+            target = None if message is None else (message.id, message.created_at)
+
+        advanced = False
+        if target is not None:
+            target_id, target_at = target
+            result = await self.db.execute(
+                update(user_groups)
+                .where(
+                    user_groups.c.group_id == group_id,
+                    user_groups.c.user_id == user_id,
+                    or_(
+                        user_groups.c.last_read_at.is_(None),
+                        tuple_(
+                            user_groups.c.last_read_at,
+                            user_groups.c.last_read_message_id,
+                        )
+                        < tuple_(target_at, target_id),
+                    ),
+                )
+                .values(last_read_message_id=target_id, last_read_at=target_at)
+            )
+            await self.db.commit()
+            advanced = result.rowcount > 0
+
+        if unread is None:
+            unread = (await self.count_unread(user_id, [group_id]))[group_id]
+            if advanced:
+                await unread_counters.set_unread(user_id, {group_id: unread})
+        last_read_message_id = await self.db.scalar(
+            select(user_groups.c.last_read_message_id).where(
+                user_groups.c.group_id == group_id, user_groups.c.user_id == user_id
+            )
+        )
+        return {
+            "group_id": group_id,
+            "last_read_message_id": last_read_message_id,
+            "unread_count": unread,
+        }
 
-    def get_user_groups(self, user_id: int) -> List[Group]:
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return []
-        return user.groups
+    async def get_user_group_ids(self, user_id: int) -> List[int]:
+        result = await self.db.scalars(
+            select(user_groups.c.group_id).where(user_groups.c.user_id == user_id)
+        )
+        return list(result)
 
-    def update_group(
+    async def update_group(
         self, group_id: int, group_update: GroupUpdate, user_id: int
     ) -> Group:
-        db_group = self.db.query(Group).filter(Group.id == group_id).first()
+        db_group = await self.db.get(Group, group_id)
         if not db_group:
             raise NotFoundException("Group not found")
 
@@ -56,94 +299,322 @@ class GroupService:
         for field, value in update_data.items():
             setattr(db_group, field, value)
 
-        self.db.commit()
-        self.db.refresh(db_group)
+        await self.db.commit()
+        await self.db.refresh(db_group)
         return db_group
 
-    def delete_group(self, group_id: int, user_id: int) -> None:
-        db_group = self.db.query(Group).filter(Group.id == group_id).first()
+    async def delete_group(self, group_id: int, user_id: int) -> None:
+        db_group = await self.db.get(Group, group_id)
         if not db_group:
             raise NotFoundException("Group not found")
 
         if db_group.owner_id != user_id:
             raise ForbiddenException("Only group owner can delete")
 
-        self.db.delete(db_group)
-        self.db.commit()
+        # members, messages and consultations are removed by ON DELETE CASCADE
+        await self.db.execute(delete(Group).where(Group.id == group_id))
+        await self.db.commit()
+        await membership_cache.clear(group_id)
+        await recent_messages.clear(group_id)
+        await first_page_cache.invalidate(group_id)
+        await unread_counters.clear_group(group_id)
 
-    def join_group(self, group_id: int, user_id: int) -> Group:
-        db_group = self.db.query(Group).filter(Group.id == group_id).first()
+    async def join_group(self, group_id: int, user_id: int) -> Group:
+        db_group = await self.db.get(Group, group_id)
         if not db_group:
             raise NotFoundException("Group not found")
 
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise NotFoundException("User not found")
-        if user in db_group.members:
+        if await self.is_group_member(group_id, user_id):
+            raise ForbiddenException("Already a member")
+
+        try:
+            # New members start at the latest message, not with the whole
+            # history unread
+            latest = (
+                select(GroupMessage.id, GroupMessage.created_at)
+                .where(GroupMessage.group_id == group_id)
+                .order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+                .limit(1)
+                .subquery()
+            )
+            await self.db.execute(
+                insert(user_groups).values(
+                    group_id=group_id,
+                    user_id=user_id,
+                    last_read_message_id=select(latest.c.id).scalar_subquery(),
+                    last_read_at=select(latest.c.created_at).scalar_subquery(),
+                )
+            )
+            await self.db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent join; the primary key kept one row
+            await self.db.rollback()
             raise ForbiddenException("Already a member")
 
-        db_group.members.append(user)
-        self.db.commit()
-        self.db.refresh(db_group)
+        await membership_cache.add(group_id, user_id)
         return db_group
 
-    def leave_group(self, group_id: int, user_id: int) -> None:
-        db_group = self.db.query(Group).filter(Group.id == group_id).first()
+    async def leave_group(self, group_id: int, user_id: int) -> None:
+        db_group = await self.db.get(Group, group_id)
         if not db_group:
             raise NotFoundException("Group not found")
 
         if db_group.owner_id == user_id:
             raise ForbiddenException("Owner cannot leave group")
 
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise NotFoundException("User not found")
-        if user not in db_group.members:
+        result = await self.db.execute(
+            delete(user_groups).where(
+                user_groups.c.group_id == group_id, user_groups.c.user_id == user_id
+            )
+        )
+        if result.rowcount == 0:
             raise ForbiddenException("Not a member")
 
-        db_group.members.remove(user)
-        self.db.commit()
+        await self.db.commit()
+        await membership_cache.remove(group_id, user_id)
+        await unread_counters.forget(user_id, group_id)
 
-    def is_group_member(self, group_id: int, user_id: int) -> bool:
-        db_group = self.db.query(Group).filter(Group.id == group_id).first()
-        if not db_group:
-            return False
+    async def is_group_member(self, group_id: int, user_id: int) -> bool:
+        if await membership_cache.contains(group_id, user_id):
+            return True
+
+        version = await membership_cache.version(group_id)
+        is_member = await self.db.scalar(
+            select(
+                exists().where(
+                    user_groups.c.group_id == group_id,
+                    user_groups.c.user_id == user_id,
+                )
+            )
+        )
+        if is_member:
+            await membership_cache.add_if_unchanged(group_id, user_id, version)
+        return is_member
+
+    async def is_lawyer_member(self, group_id: int, lawyer_id: int) -> bool:
+        return await self.db.scalar(
+            select(
+                exists().where(
+                    lawyer_groups.c.group_id == group_id,
+                    lawyer_groups.c.lawyer_id == lawyer_id,
+                )
+            )
+        )
+
+    async def is_member(self, group_id: int, member: Union[User, Lawyer]) -> bool:
+        if isinstance(member, Lawyer):
+            return await self.is_lawyer_member(group_id, member.id)
+        return await self.is_group_member(group_id, member.id)
 
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return False
-        return user in db_group.members
+    async def get_member_group_ids(self, member: Union[User, Lawyer]) -> List[int]:
+        if isinstance(member, Lawyer):
+            result = await self.db.scalars(
+                select(lawyer_groups.c.group_id).where(
+                    lawyer_groups.c.lawyer_id == member.id
+                )
+            )
+            return list(result)
+        return await self.get_user_group_ids(member.id)
 
-    def create_message(self, message: MessageCreate, author_id: int) -> GroupMessage:
+    async def create_message(
+        self,
+        message: MessageCreate,
+        author_id: Optional[int] = None,
+        lawyer_author_id: Optional[int] = None,
+    ) -> GroupMessage:
         db_message = GroupMessage(
-            content=message.content, group_id=message.group_id, author_id=author_id
+            content=message.content,
+            group_id=message.group_id,
+            author_id=author_id,
+            lawyer_author_id=lawyer_author_id,
         )
         self.db.add(db_message)
-        self.db.commit()
-        self.db.refresh(db_message)
+        await self.db.commit()
+        await self.db.refresh(db_message)
+        await first_page_cache.add(db_message)
         return db_message
 
-    def get_group_messages(
-        self, group_id: int, skip: int = 0, limit: int = 50
-    ) -> List[GroupMessage]:
-        return (
-            self.db.query(GroupMessage)
-            .filter(GroupMessage.group_id == group_id)
-            .order_by(GroupMessage.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+    async def get_first_page(self, group_id: int, limit: int) -> Optional[str]:
+        """The newest page of messages as encoded MessagePage JSON.
+
+        Served from the Redis cache; a miss reads the latest messages once
+        and fills it, after which writes keep it current. Returns None when
+        ``limit`` is larger than the cache, for get_group_messages to serve.
+        """
+        if limit > settings.message_page_cache_size:
+            return None
+        page = await first_page_cache.get(group_id, limit)
+        if page is not None:
+            return page
+        version = await first_page_cache.version(group_id)
+        messages = await self.db.scalars(
+            select(GroupMessage)
+            .where(GroupMessage.group_id == group_id)
+            .order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+            .limit(settings.message_page_cache_size + 1)
         )
+        return await first_page_cache.fill(group_id, list(messages), limit, version)
+
+    async def get_group_messages(
+        self,
+        group_id: int,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, int]] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> dict:
+        """Return a page of messages, newest first.
+
+        ``before``/``after`` are (created_at, id) keys from a previous page.
+        Each page is a single range scan on
+        ix_group_messages_group_id_created_at_id, so the cost does not
+        depend on how far back the page is. The plain created_at bound
+        repeats the row comparison so Postgres can prune monthly partitions.
+        """
+        key = tuple_(GroupMessage.created_at, GroupMessage.id)
+        query = select(GroupMessage).where(GroupMessage.group_id == group_id)
+        if after is not None:
+            query = query.where(
+                key > tuple_(*after), GroupMessage.created_at >= after[0]
+            ).order_by(GroupMessage.created_at.asc(), GroupMessage.id.asc())
+        else:
+            if before is not None:
+                query = query.where(
+                    key < tuple_(*before), GroupMessage.created_at <= before[0]
+                )
+            query = query.order_by(
+                GroupMessage.created_at.desc(), GroupMessage.id.desc()
+            )
 
-    def delete_message(self, message_id: int, user_id: int) -> None:
-        db_message = (
-            self.db.query(GroupMessage).filter(GroupMessage.id == message_id).first()
+        messages = list(await self.db.scalars(query.limit(limit + 1)))
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+
+        next_cursor = None
+        if has_more:
+            edge = messages[-1]
+            next_cursor = encode_cursor([edge.created_at, edge.id])
+        if after is not None:
+            messages.reverse()
+
+        return {"items": messages, "next_cursor": next_cursor}
+
+    async def search_messages(
+        self,
+        group_id: int,
+        query: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, datetime, int]] = None,
+    ) -> dict:
+        """Messages in the group matching ``query``, best match first.
+
+        Full-text search on content_tsv, or substring matching on the trigram
+        index for text the search configuration cannot split into words, such
+        as Korean. ``after`` is the (rank, created_at, id) key that ends the
+        previous page.
+        """
+        if self._search_mode(query) == "trigram":
+            pattern = re.sub(r"([\\%_])", r"\\\1", query)
+            match = GroupMessage.content.ilike(f"%{pattern}%", escape="\\")
+            rank = func.similarity(GroupMessage.content, query)
+        else:
+            tsquery = func.websearch_to_tsquery(settings.message_search_config, query)
+            match = CONTENT_TSV.op("@@")(tsquery)
+            rank = func.ts_rank(CONTENT_TSV, tsquery)
+
+        statement = (
+            select(GroupMessage, rank.label("rank"))
+            .where(GroupMessage.group_id == group_id, match)
+            .order_by(
+                rank.desc(), GroupMessage.created_at.desc(), GroupMessage.id.desc()
+            )
         )
+        if after is not None:
+            statement = statement.where(
+                tuple_(rank, GroupMessage.created_at, GroupMessage.id) < tuple_(*after)
+            )
+
+        rows = (await self.db.execute(statement.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            edge, edge_rank = rows[-1]
+            next_cursor = encode_cursor([edge_rank, edge.created_at, edge.id])
+        items = [
+            MessageSearchResult(
+                **MessageResponse.model_validate(message).model_dump(), rank=rank
+            )
+            for message, rank in rows
+        ]
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _search_mode(self, query: str) -> str:
+        mode = settings.message_search_mode
+        if mode == "auto":
+            return "trigram" if HANGUL.search(query) else "fts"
+        return mode
+
+    async def get_messages_since(
+        self, group_id: int, message_id: int, limit: int
+    ) -> List[Tuple[GroupMessage, Union[User, Lawyer]]]:
+        """Messages after ``message_id`` with their authors, oldest first.
+
+        The author is the user or the lawyer who wrote the message. Falls
+        back to the latest ``limit`` messages when ``message_id`` is unknown,
+        e.g. because it was deleted.
+        """
+        query = (
+            select(GroupMessage, User, Lawyer)
+            .outerjoin(User, GroupMessage.author_id == User.id)
+            .outerjoin(Lawyer, GroupMessage.lawyer_author_id == Lawyer.id)
+            .where(GroupMessage.group_id == group_id)
+        )
+        anchor = await self.db.get(GroupMessage, message_id)
+        if anchor is not None and anchor.group_id == group_id:
+            key = tuple_(GroupMessage.created_at, GroupMessage.id)
+            query = query.where(
+                key > tuple_(anchor.created_at, anchor.id),
+                GroupMessage.created_at >= anchor.created_at,
+            ).order_by(GroupMessage.created_at.asc(), GroupMessage.id.asc())
+            rows = (await self.db.execute(query.limit(limit))).tuples()
+            return [(message, user or lawyer) for message, user, lawyer in rows]
+
+        query = query.order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+        rows = (await self.db.execute(query.limit(limit))).tuples()
+        rows = [(message, user or lawyer) for message, user, lawyer in rows]
+        rows.reverse()
+        return rows
+
+    async def delete_message(self, message_id: int, user_id: int) -> None:
+        db_message = await self.db.get(GroupMessage, message_id)
         if not db_message:
             raise NotFoundException("Message not found")
 
         if db_message.author_id != user_id:
             raise ForbiddenException("Can only delete own messages")
 
-        self.db.delete(db_message)
-        self.db.commit()
+        # Members who had not read it yet, while their markers are still
+        # comparable with the message
+        unread_by = (
+            await self.db.scalars(
+                select(user_groups.c.user_id).where(
+                    user_groups.c.group_id == db_message.group_id,
+                    user_groups.c.user_id != user_id,
+                    or_(
+                        user_groups.c.last_read_at.is_(None),
+                        tuple_(db_message.created_at, db_message.id)
+                        > tuple_(
+                            user_groups.c.last_read_at,
+                            user_groups.c.last_read_message_id,
+                        ),
+                    ),
+                )
+            )
+        ).all()
+        await self.db.delete(db_message)
+        await self.db.commit()
+        # The replay buffer would otherwise hand the message out again
+        await recent_messages.clear(db_message.group_id)
+        await first_page_cache.invalidate(db_message.group_id)
+        await unread_counters.forget_message(db_message.group_id, unread_by)
@@ -1,12 +1,14 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
+from uuid import uuid4
 
-import bcrypt
 from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.exceptions import NotFoundException, UnauthorizedException
+from app.core.hashing import password_hasher
 from app.models.lawyer import Lawyer, LawyerReview
 from app.models.user import User
 from app.schemas.lawyer import (
@@ -15,25 +17,18 @@ from app.schemas.lawyer import (
     LawyerReviewCreate,
     ProfileUpdate,
 )
+from app.services.principal_cache import lawyer_cache
 
 
 class LawyerService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        try:
-            return bcrypt.checkpw(
-                plain_password.encode("utf-8"), hashed_password.encode("utf-8")
-            )
-        except ValueError:
-            return False
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        pwd_bytes = password.encode("utf-8")
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(pwd_bytes, salt)
-        return hashed_password.decode("utf-8")
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
@@ -43,22 +38,24 @@ class LawyerService:
             expire = datetime.now(timezone.utc) + expires_delta
         else:
             expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "jti": uuid4().hex})
         encoded_jwt = jwt.encode(
             to_encode, settings.secret_key, algorithm=settings.algorithm
         )
         return encoded_jwt
 
-    def authenticate_lawyer(self, username: str, password: str) -> Optional[Lawyer]:
-        lawyer = self.db.query(Lawyer).filter(Lawyer.username == username).first()
+    async def authenticate_lawyer(
+        self, username: str, password: str
+    ) -> Optional[Lawyer]:
+        lawyer = await self.db.scalar(select(Lawyer).where(Lawyer.username == username))
         if not lawyer:
             return None
-        if not self._verify_password(password, lawyer.hashed_password):
+        if not await self._verify_password(password, lawyer.hashed_password):
             return None
         return lawyer
 
-    def create_lawyer(self, lawyer: LawyerCreate) -> Lawyer:
-        hashed_password = self.get_password_hash(lawyer.password)
+    async def create_lawyer(self, lawyer: LawyerCreate) -> Lawyer:
+        hashed_password = await self.get_password_hash(lawyer.password)
         db_lawyer = Lawyer(
             lawyer_id=lawyer.lawyer_id,
             hashed_password=hashed_password,
@@ -68,38 +65,42 @@ class LawyerService:
             specializations=lawyer.specializations,
         )
         self.db.add(db_lawyer)
-        self.db.commit()
-        self.db.refresh(db_lawyer)
+        await self.db.commit()
+        await self.db.refresh(db_lawyer)
         return db_lawyer
 
-    def change_password(
+    async def change_password(
         self, lawyer_id: int, current_password: str, new_password: str
     ) -> bool:
-        lawyer = self.db.query(Lawyer).filter(Lawyer.id == lawyer_id).first()
+        lawyer = await self.db.get(Lawyer, lawyer_id)
         if not lawyer:
             raise UnauthorizedException("Lawyer not found")
 
-        if not self._verify_password(current_password, lawyer.hashed_password):
+        if not await self._verify_password(current_password, lawyer.hashed_password):
             raise UnauthorizedException("Current password is incorrect")
 
-        lawyer.hashed_password = self.get_password_hash(new_password)
+        lawyer.hashed_password = await self.get_password_hash(new_password)
 
-        self.db.commit()
+        await self.db.commit()
+        await lawyer_cache.invalidate(lawyer_id)
         return True
 
-    def get_lawyer_by_lawyer_id(self, lawyer_id: int) -> Optional[Lawyer]:
-        return self.db.query(Lawyer).filter(Lawyer.lawyer_id == lawyer_id).first()
+    async def get_lawyer_by_lawyer_id(self, lawyer_id: int) -> Optional[Lawyer]:
+        return await self.db.scalar(select(Lawyer).where(Lawyer.lawyer_id == lawyer_id))
 
-    def get_lawyer_reviews(self, lawyer_id: int) -> List[LawyerReview]:
-        lawyer = self.get_lawyer_by_lawyer_id(lawyer_id)
+    async def get_lawyer_reviews(self, lawyer_id: int) -> List[LawyerReview]:
+        lawyer = await self.get_lawyer_by_lawyer_id(lawyer_id)
         if not lawyer:
             raise NotFoundException("Lawyer not found")
-        return lawyer.reviews
+        result = await self.db.scalars(
+            select(LawyerReview).where(LawyerReview.lawyer_id == lawyer.id)
+        )
+        return list(result)
 
-    def create_review(
+    async def create_review(
         self, review: LawyerReviewCreate, lawyer_id: int, current_user: User
     ) -> LawyerReview:
-        lawyer = self.get_lawyer_by_lawyer_id(lawyer_id)
+        lawyer = await self.get_lawyer_by_lawyer_id(lawyer_id)
         if not lawyer:
             raise NotFoundException("Lawyer not found")
 
@@ -109,12 +110,14 @@ class LawyerService:
             review=review.review,
         )
         self.db.add(db_review)
-        self.db.commit()
-        self.db.refresh(db_review)
+        await self.db.commit()
+        await self.db.refresh(db_review)
         return db_review
 
-    def update_profile(self, lawyer_id: int, profile_update: ProfileUpdate) -> Lawyer:
-        db_lawyer = self.db.query(Lawyer).filter(Lawyer.id == lawyer_id).first()
+    async def update_profile(
+        self, lawyer_id: int, profile_update: ProfileUpdate
+    ) -> Lawyer:
+        db_lawyer = await self.db.get(Lawyer, lawyer_id)
         if not db_lawyer:
             raise NotFoundException("Lawyer not found")
 
@@ -122,29 +125,30 @@ class LawyerService:
         for field, value in update_data.items():
             setattr(db_lawyer, field, value)
 
-        self.db.commit()
-        self.db.refresh(db_lawyer)
+        await self.db.commit()
+        await self.db.refresh(db_lawyer)
+        await lawyer_cache.invalidate(lawyer_id)
         return db_lawyer
 
-    def update_lawyer_id(
+    async def update_lawyer_id(
         self, lawyer_id: int, lawyer_id_update: LawyerIdUpdate
     ) -> Lawyer:
-        db_lawyer = self.db.query(Lawyer).filter(Lawyer.id == lawyer_id).first()
+        db_lawyer = await self.db.get(Lawyer, lawyer_id)
         if not db_lawyer:
             raise NotFoundException("Lawyer not found")
 
         setattr(db_lawyer, "lawyer_id", lawyer_id_update.lawyer_id)
         setattr(db_lawyer, "lawyer_id_changed_at", datetime.now(timezone.utc))
 
-        self.db.commit()
-        self.db.refresh(db_lawyer)
+        await self.db.commit()
+        await self.db.refresh(db_lawyer)
+        await lawyer_cache.invalidate(lawyer_id)
         return db_lawyer
 
-    def search_lawyers_by_specialization(
+    async def search_lawyers_by_specialization(
         self, specialization: str
     ) -> List[Lawyer]:
-        return (
-            self.db.query(Lawyer)
-            .filter(Lawyer.specializations.contains([specialization]))
-            .all()
+        result = await self.db.scalars(
+            select(Lawyer).where(Lawyer.specializations.contains([specialization]))
         )
+        return list(result)
@@ -0,0 +1,95 @@
+from typing import Optional
+
+from redis.exceptions import WatchError
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+
+class MembershipCache:
+    """Redis set of confirmed members per group, kept write-through.
+
+    Only positive answers are cached, so a missing entry always falls back
+    to the database and the set never has to hold the full member list.
+
+    A positive read from the database can be overtaken by a leave that
+    commits before it is cached. Every removal therefore bumps a per-group
+    version, and ``add_if_unchanged`` only caches a database read if the
+    version it saw beforehand is still current.
+    """
+
+    def _key(self, group_id: int) -> str:
+        return f"group:{group_id}:members"
+
+    def _version_key(self, group_id: int) -> str:
+        return f"group:{group_id}:members:version"
+
+    async def contains(self, group_id: int, user_id: int) -> bool:
+        if not settings.membership_cache_enabled:
+            return False
+        client = await get_redis()
+        return bool(await client.sismember(self._key(group_id), user_id))
+
+    async def version(self, group_id: int) -> Optional[str]:
+        """Read before querying the database; pass to ``add_if_unchanged``."""
+        if not settings.membership_cache_enabled:
+            return None
+        client = await get_redis()
+        return await client.get(self._version_key(group_id))
+
+    async def add(self, group_id: int, user_id: int) -> None:
+        """Cache a membership that was just written, e.g. by a join."""
+        if not settings.membership_cache_enabled:
+            return
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.sadd(self._key(group_id), user_id)
+            pipe.expire(self._key(group_id), settings.membership_cache_ttl)
+            await pipe.execute()
+
+    async def add_if_unchanged(
+        self, group_id: int, user_id: int, version: Optional[str]
+    ) -> None:
+        """Cache a membership read from the database.
+
+        Skipped if a member was removed from the group since ``version`` was
+        taken, since the read may predate that removal.
+        """
+        if not settings.membership_cache_enabled:
+            return
+        client = await get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self._version_key(group_id))
+                if await pipe.get(self._version_key(group_id)) != version:
+                    return
+                pipe.multi()
+                pipe.sadd(self._key(group_id), user_id)
+                pipe.expire(self._key(group_id), settings.membership_cache_ttl)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def remove(self, group_id: int, user_id: int) -> None:
+        if not settings.membership_cache_enabled:
+            return
+        await self._invalidate(group_id, user_id)
+
+    async def clear(self, group_id: int) -> None:
+        if not settings.membership_cache_enabled:
+            return
+        await self._invalidate(group_id)
+
+    async def _invalidate(self, group_id: int, user_id: Optional[int] = None) -> None:
+        client = await get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(self._version_key(group_id))
+            pipe.expire(self._version_key(group_id), settings.membership_cache_ttl)
+            if user_id is None:
+                pipe.delete(self._key(group_id))
+            else:
+                pipe.srem(self._key(group_id), user_id)
+            await pipe.execute()
+
+
+membership_cache = MembershipCache()
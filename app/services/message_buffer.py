@@ -0,0 +1,48 @@
+from typing import List, Optional
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+
+class RecentMessageBuffer:
+    """Bounded per-group list of the latest encoded chat frames in Redis.
+
+    Entries are stored newest first as ``"{id}:{payload}"`` so a replay can
+    find its starting point without decoding every frame.
+    """
+
+    def key(self, group_id: int) -> str:
+        return f"group:{group_id}:recent"
+
+    async def append(self, group_id: int, message_id: int, payload: str) -> None:
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.lpush(self.key(group_id), f"{message_id}:{payload}")
+            pipe.ltrim(self.key(group_id), 0, settings.recent_buffer_size - 1)
+            await pipe.execute()
+
+    async def since(self, group_id: int, last_seen_id: int) -> Optional[List[str]]:
+        """Frames after ``last_seen_id``, oldest first.
+
+        Returns None when ``last_seen_id`` is not in the buffer, meaning the
+        gap may be larger than the buffer and the caller must use the DB.
+        Ids are not ordered across workers, so this goes by list position
+        rather than comparing ids.
+        """
+        client = await get_redis()
+        entries = await client.lrange(self.key(group_id), 0, -1)
+        marker = f"{last_seen_id}:"
+        frames = []
+        for entry in entries:
+            if entry.startswith(marker):
+                frames.reverse()
+                return frames
+            frames.append(entry.partition(":")[2])
+        return None
+
+    async def clear(self, group_id: int) -> None:
+        client = await get_redis()
+        await client.delete(self.key(group_id))
+
+
+recent_messages = RecentMessageBuffer()
@@ -0,0 +1,157 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from redis.exceptions import WatchError
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.pagination import encode_cursor
+from app.db.redis import get_redis
+from app.models.group import GroupMessage
+from app.schemas.message import MessageResponse
+
+page_cache_requests = Counter(
+    "message_page_cache_requests_total",
+    "First-page history reads by whether the Redis cache could serve them",
+)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Marks a key filled from the database, as opposed to one created by a
+# write-through for a group that was never read; only filled keys are served.
+COMPLETE = "complete"
+
+# Outlives any read that could still be filling the cache from the database
+VERSION_TTL = 3600
+
+
+class FirstPageCache:
+    """Latest messages per group as encoded MessageResponse JSON in Redis.
+
+    A sorted set scored by created_at in microseconds, with members
+    ``"{id:020d}:{json}"`` so ties order by id and the set follows the
+    (created_at, id) order of the history endpoint even when messages from
+    several workers arrive out of order. It holds one message more than the
+    largest page it serves, which is enough to tell whether older messages
+    exist.
+
+    A fill from the database can be overtaken by a delete that invalidates
+    the key before the fill lands, which would put the deleted message back.
+    ``invalidate`` therefore bumps a per-group version, and ``fill`` only
+    stores its read if the version it saw beforehand is still current.
+    """
+
+    def _key(self, group_id: int) -> str:
+        return f"group:{group_id}:first_page"
+
+    def _version_key(self, group_id: int) -> str:
+        return f"group:{group_id}:first_page:version"
+
+    def _capacity(self) -> int:
+        return settings.message_page_cache_size + 1
+
+    def _entry(self, message: GroupMessage) -> tuple[str, int]:
+        created_at = message.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        score = (created_at - EPOCH) // timedelta(microseconds=1)
+        payload = MessageResponse.model_validate(message).model_dump_json()
+        return f"{message.id:020d}:{payload}", score
+
+    async def get(self, group_id: int, limit: int) -> Optional[str]:
+        """The encoded MessagePage for the first ``limit`` messages, or None.
+
+        ``limit`` must not exceed message_page_cache_size.
+        """
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zscore(self._key(group_id), COMPLETE)
+            pipe.zrevrange(self._key(group_id), 0, limit)
+            complete, entries = await pipe.execute()
+        if complete is None:
+            page_cache_requests.inc(result="miss")
+            return None
+        page_cache_requests.inc(result="hit")
+        return self._page(
+            [entry.partition(":")[2] for entry in entries if entry != COMPLETE],
+            limit,
+        )
+
+    async def version(self, group_id: int) -> Optional[str]:
+        """Read before querying the database; pass to ``fill``."""
+        client = await get_redis()
+        return await client.get(self._version_key(group_id))
+
+    async def fill(
+        self,
+        group_id: int,
+        messages: List[GroupMessage],
+        limit: int,
+        version: Optional[str],
+    ) -> str:
+        """Store the latest messages read from the database; return the page.
+
+        ``messages`` are newest first, as many as the cache holds. Entries
+        added by concurrent writes are kept. Nothing is stored if the group
+        was invalidated since ``version`` was taken.
+        """
+        entries = dict(self._entry(message) for message in messages)
+        payloads = [member.partition(":")[2] for member in entries]
+        entries[COMPLETE] = float("-inf")
+        client = await get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self._version_key(group_id))
+                if await pipe.get(self._version_key(group_id)) == version:
+                    pipe.multi()
+                    pipe.zadd(self._key(group_id), entries)
+                    self._trim(pipe, group_id)
+                    await pipe.execute()
+            except WatchError:
+                pass
+        return self._page(payloads[: limit + 1], limit)
+
+    async def add(self, message: GroupMessage) -> None:
+        await self.add_many([message])
+
+    async def add_many(self, messages: Iterable[GroupMessage]) -> None:
+        """Write committed messages through, in one round trip."""
+        by_group: Dict[int, Dict[str, int]] = {}
+        for message in messages:
+            member, score = self._entry(message)
+            by_group.setdefault(message.group_id, {})[member] = score
+        if not by_group:
+            return
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            for group_id, entries in by_group.items():
+                pipe.zadd(self._key(group_id), entries)
+                self._trim(pipe, group_id)
+            await pipe.execute()
+
+    async def invalidate(self, group_id: int) -> None:
+        client = await get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(self._version_key(group_id))
+            pipe.expire(self._version_key(group_id), VERSION_TTL)
+            pipe.delete(self._key(group_id))
+            await pipe.execute()
+
+    def _trim(self, pipe, group_id: int) -> None:
+        # Rank 0 is the COMPLETE marker once filled; keep it and the newest
+        # ``capacity`` messages, ranks -capacity to -1
+        pipe.zremrangebyrank(self._key(group_id), 1, -(self._capacity() + 1))
+
+    def _page(self, items: List[str], limit: int) -> str:
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            edge = json.loads(items[-1])
+            next_cursor = encode_cursor([edge["created_at"], edge["id"]])
+        return (
+            f'{{"items":[{",".join(items)}],"next_cursor":{json.dumps(next_cursor)}}}'
+        )
+
+
+first_page_cache = FirstPageCache()
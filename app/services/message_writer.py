@@ -0,0 +1,262 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.db.database import AsyncSessionLocal, engine
+from app.db.redis import get_redis
+from app.models.group import GroupMessage
+from app.schemas.message import MessageCreate
+from app.services.message_page_cache import first_page_cache
+
+logger = logging.getLogger(__name__)
+
+# Redis list of rows the database rejected, newest first, for inspection
+# and manual replay
+DEAD_LETTER_KEY = "message_writer:dead_letters"
+DEAD_LETTER_MAX = 10000
+
+pending_messages = Gauge(
+    "message_writer_pending", "Chat messages accepted but not yet committed"
+)
+flushed_messages = Counter(
+    "message_writer_flushed_total", "Chat messages committed by the writer"
+)
+flush_failures = Counter(
+    "message_writer_flush_failures_total", "Failed write-behind flushes"
+)
+dead_lettered_messages = Counter(
+    "message_writer_dead_lettered_total",
+    "Chat messages the database rejected, moved to the dead-letter list",
+)
+batch_sizes = Histogram(
+    "message_writer_batch_size",
+    "Messages per multi-row insert",
+    buckets=(1, 5, 10, 50, 100, 250, 500, 1000),
+)
+
+
+class WriterBacklogFull(Exception):
+    """The database is too far behind to accept another message."""
+
+
+class MessageWriter:
+    """Write-behind persistence for chat messages.
+
+    ``submit`` assigns the id and timestamps up front so the message can be
+    broadcast immediately; rows are then committed in multi-row inserts once
+    the batch size or flush interval is reached. Ids come from the
+    group_messages sequence in blocks, so they are unique across workers but
+    only ordered within one worker; history is ordered by (created_at, id).
+    Other databases are only supported for load tests, through
+    ``message_writer_local_ids``.
+    """
+
+    def __init__(self):
+        self._pending: List[dict] = []
+        self._ids: Deque[int] = deque()
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._local_next_id: Optional[int] = None
+
+    async def start(self) -> None:
+        # A fresh event for the running loop, so the writer can be restarted
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Everything accepted before shutdown must reach the database
+        while self._pending:
+            if not await self.flush():
+                logger.error("Dropping %d unsaved messages", len(self._pending))
+                break
+
+    async def submit(
+        self,
+        message: MessageCreate,
+        author_id: Optional[int] = None,
+        lawyer_author_id: Optional[int] = None,
+    ) -> GroupMessage:
+        if len(self._pending) >= settings.message_writer_max_pending:
+            # Database is behind; make the sender wait for a flush, and turn
+            # the message away if even that could not make room
+            await self.flush()
+            if len(self._pending) >= settings.message_writer_max_pending:
+                raise WriterBacklogFull()
+
+        now = datetime.now(timezone.utc)
+        row = {
+            "id": await self._next_id(),
+            "content": message.content,
+            "group_id": message.group_id,
+            "author_id": author_id,
+            "lawyer_author_id": lawyer_author_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._pending.append(row)
+        pending_messages.inc()
+        if len(self._pending) >= settings.message_flush_batch_size:
+            self._wakeup.set()
+        return GroupMessage(**row)
+
+    async def _next_id(self) -> int:
+        if not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    self._ids.extend(
+                        await self._reserve_ids(settings.message_id_block_size)
+                    )
+        return self._ids.popleft()
+
+    async def _reserve_ids(self, count: int) -> List[int]:
+        if engine.dialect.name != "postgresql":
+            if not settings.message_writer_local_ids:
+                raise RuntimeError(
+                    "Message ids come from the Postgres group_messages sequence; "
+                    "set MESSAGE_WRITER_LOCAL_IDS for a single-worker load test"
+                )
+            if self._local_next_id is None:
+                async with AsyncSessionLocal() as db:
+                    last_id = await db.scalar(select(func.max(GroupMessage.id)))
+                self._local_next_id = (last_id or 0) + 1
+            start = self._local_next_id
+            self._local_next_id += count
+            return list(range(start, start + count))
+
+        async with AsyncSessionLocal() as db:
+            result = await db.scalars(
+                text(
+                    "SELECT nextval(pg_get_serial_sequence('group_messages', 'id')) "
+                    "FROM generate_series(1, :count)"
+                ),
+                {"count": count},
+            )
+            return list(result)
+
+    async def flush(self) -> bool:
+        """Commit the pending rows; False if some are still pending.
+
+        Only connection-level failures put rows back for the next attempt.
+        If the database rejects the batch itself, e.g. a foreign key to a
+        group deleted while its messages were queued, the rows are retried
+        one by one and those that still fail are dead-lettered, so one bad
+        row cannot stall persistence for the whole worker.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            batch, self._pending = self._pending, []
+            try:
+                await self._insert(batch)
+            except Exception as error:
+                flush_failures.inc()
+                if _is_transient(error):
+                    logger.exception("Failed to flush %d messages", len(batch))
+                    self._pending[:0] = batch
+                    return False
+                logger.warning(
+                    "Batch of %d messages rejected, inserting one by one",
+                    len(batch),
+                    exc_info=True,
+                )
+                return await self._insert_each(batch)
+
+            pending_messages.dec(len(batch))
+            flushed_messages.inc(len(batch))
+            batch_sizes.observe(len(batch))
+            await self._cache(batch)
+            return True
+
+    async def _insert(self, rows: List[dict]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(GroupMessage), rows)
+            await db.commit()
+
+    async def _insert_each(self, batch: List[dict]) -> bool:
+        inserted = []
+        try:
+            for index, row in enumerate(batch):
+                try:
+                    await self._insert([row])
+                except Exception as error:
+                    if _is_transient(error):
+                        logger.exception("Failed to flush %d messages", len(batch))
+                        self._pending[:0] = batch[index:]
+                        return False
+                    await self._dead_letter(row, error)
+                else:
+                    inserted.append(row)
+                    flushed_messages.inc()
+                    batch_sizes.observe(1)
+                pending_messages.dec()
+            return True
+        finally:
+            await self._cache(inserted)
+
+    async def _cache(self, rows: List[dict]) -> None:
+        # Only committed rows, so the cache never serves a message that a
+        # failed flush may yet lose
+        try:
+            await first_page_cache.add_many(GroupMessage(**row) for row in rows)
+        except Exception:
+            logger.exception("Could not cache %d flushed messages", len(rows))
+
+    async def _dead_letter(self, row: dict, error: Exception) -> None:
+        dead_lettered_messages.inc()
+        logger.error(
+            "Dead-lettering message %s for group %s: %s",
+            row["id"],
+            row["group_id"],
+            error,
+        )
+        entry = json.dumps(
+            {**row, "error": str(error).splitlines()[0]},
+            default=lambda value: value.isoformat(),
+        )
+        try:
+            client = await get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.lpush(DEAD_LETTER_KEY, entry)
+                pipe.ltrim(DEAD_LETTER_KEY, 0, DEAD_LETTER_MAX - 1)
+                await pipe.execute()
+        except Exception:
+            logger.exception("Could not store dead-lettered message %s", row["id"])
+
+    async def _run(self) -> None:
+        interval = settings.message_flush_interval_ms / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether the database was unreachable, as opposed to refusing the rows."""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(
+            error, (OperationalError, InterfaceError)
+        )
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+message_writer = MessageWriter()
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL_SECONDS = 6 * 60 * 60
+
+
+class PartitionMaintainer:
+    """Keeps monthly group_messages partitions created ahead of time.
+
+    Calls ensure_group_messages_partitions (see the partitioning migration)
+    on startup and every few hours, so the next months' partitions exist
+    well before the first message lands in them. Every worker runs it; the
+    function serializes them with an advisory lock and skips partitions
+    that already exist. Only Postgres is partitioned.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if engine.dialect.name != "postgresql":
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def ensure(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                text("SELECT ensure_group_messages_partitions(:months)"),
+                {"months": settings.message_partition_months_ahead},
+            )
+            await db.commit()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.ensure()
+            except Exception:
+                logger.exception("Failed to create group_messages partitions")
+            await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+
+
+partition_maintainer = PartitionMaintainer()
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Set, Union
+from uuid import uuid4
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.services.websocket_service import Connection, manager
+
+logger = logging.getLogger(__name__)
+
+
+# Members are user ids, or "lawyer:{id}" strings for lawyers
+MemberKey = Union[int, str]
+
+# Drop this worker's entry for a member; the member only goes offline if no
+# other worker holds an unexpired entry. Returns 1 if they went offline.
+_LEAVE_SCRIPT = """
+redis.call('HDEL', KEYS[2], ARGV[2])
+for _, expires_at in ipairs(redis.call('HVALS', KEYS[2])) do
+    if tonumber(expires_at) > tonumber(ARGV[3]) then
+        return 0
+    end
+end
+redis.call('DEL', KEYS[2])
+return redis.call('ZREM', KEYS[1], ARGV[1])
+"""
+
+
+def _member(value: str) -> MemberKey:
+    return int(value) if value.isdigit() else value
+
+
+def _sort_key(member: MemberKey) -> tuple:
+    return (isinstance(member, str), member)
+
+
+class _GroupDelta:
+    __slots__ = ("online", "offline", "typing")
+
+    def __init__(self):
+        self.online: Set[MemberKey] = set()
+        self.offline: Set[MemberKey] = set()
+        self.typing: Set[MemberKey] = set()
+
+
+class PresenceService:
+    """Online members and typing state per group.
+
+    Both live in Redis sorted sets scored by expiry time, so reads are a
+    single ZRANGEBYSCORE over the live entries (O(online), not O(members)).
+    This worker refreshes the entries of its own sockets on a heartbeat;
+    entries of a crashed worker simply expire. Changes are buffered and
+    broadcast as one delta per group per flush interval.
+
+    A member can be connected to several workers at once (a second tab or
+    device), so each member also has a hash of worker id to expiry time.
+    Leaving only takes them offline once no other worker holds them.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid4().hex
+        # group_id -> member -> number of this worker's sockets
+        self._local: Dict[int, Dict[MemberKey, int]] = {}
+        self._deltas: Dict[int, _GroupDelta] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._leave_script = None
+
+    def _presence_key(self, group_id: int) -> str:
+        return f"presence:{group_id}"
+
+    def _workers_key(self, group_id: int, user_id: MemberKey) -> str:
+        return f"presence:{group_id}:{user_id}"
+
+    def _typing_key(self, group_id: int) -> str:
+        return f"typing:{group_id}"
+
+    def _delta(self, group_id: int) -> _GroupDelta:
+        delta = self._deltas.get(group_id)
+        if delta is None:
+            delta = self._deltas[group_id] = _GroupDelta()
+        return delta
+
+    async def start(self) -> None:
+        manager.on_membership_change = self._on_membership_change
+        self._tasks = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._local:
+            for group_id, users in self._local.items():
+                for user_id in users:
+                    await self._leave(group_id, user_id)
+            self._local.clear()
+
+    async def join(self, group_id: int, user_id: MemberKey) -> None:
+        users = self._local.setdefault(group_id, {})
+        users[user_id] = users.get(user_id, 0) + 1
+        if users[user_id] > 1:
+            return
+
+        expires_at = time.time() + settings.presence_ttl
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hset(self._workers_key(group_id, user_id), self.worker_id, expires_at)
+            pipe.expire(self._workers_key(group_id, user_id), settings.presence_ttl)
+            pipe.zadd(self._presence_key(group_id), {str(user_id): expires_at})
+            _, _, added = await pipe.execute()
+        if added:
+            delta = self._delta(group_id)
+            delta.offline.discard(user_id)
+            delta.online.add(user_id)
+
+    async def leave(self, group_id: int, user_id: MemberKey) -> None:
+        users = self._local.get(group_id)
+        if not users or user_id not in users:
+            return
+        users[user_id] -= 1
+        if users[user_id] > 0:
+            return
+        del users[user_id]
+        if not users:
+            del self._local[group_id]
+
+        if not await self._leave(group_id, user_id):
+            # Still connected to another worker
+            return
+        delta = self._delta(group_id)
+        delta.online.discard(user_id)
+        delta.typing.discard(user_id)
+        delta.offline.add(user_id)
+
+    async def _leave(self, group_id: int, user_id: MemberKey) -> bool:
+        client = await get_redis()
+        if self._leave_script is None:
+            self._leave_script = client.register_script(_LEAVE_SCRIPT)
+        went_offline = await self._leave_script(
+            keys=[self._presence_key(group_id), self._workers_key(group_id, user_id)],
+            args=[str(user_id), self.worker_id, time.time()],
+            client=client,
+        )
+        return bool(went_offline)
+
+    async def _on_membership_change(
+        self, connection: Connection, group_id: int, joined: bool
+    ) -> None:
+        if joined:
+            await self.join(group_id, connection.user_id)
+        else:
+            await self.leave(group_id, connection.user_id)
+
+    def typing(self, group_id: int, user_id: MemberKey) -> None:
+        self._delta(group_id).typing.add(user_id)
+
+    async def snapshot(self, group_id: int) -> dict:
+        now = time.time()
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(self._presence_key(group_id), now, "+inf")
+            pipe.zrangebyscore(self._typing_key(group_id), now, "+inf")
+            online, typing = await pipe.execute()
+        return {
+            "type": "presence",
+            "group_id": group_id,
+            "online": [_member(value) for value in online],
+            "offline": [],
+            "typing": [_member(value) for value in typing],
+        }
+
+    async def flush(self) -> None:
+        if not self._deltas:
+            return
+        deltas, self._deltas = self._deltas, {}
+
+        typing_groups = {g: d.typing for g, d in deltas.items() if d.typing}
+        if typing_groups:
+            expires_at = time.time() + settings.typing_ttl
+            client = await get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                for group_id, users in typing_groups.items():
+                    pipe.zadd(
+                        self._typing_key(group_id),
+                        {str(user_id): expires_at for user_id in users},
+                    )
+                    pipe.expire(self._typing_key(group_id), settings.typing_ttl)
+                await pipe.execute()
+
+        for group_id, delta in deltas.items():
+            await manager.broadcast(
+                {
+                    "type": "presence",
+                    "group_id": group_id,
+                    "online": sorted(delta.online, key=_sort_key),
+                    "offline": sorted(delta.offline, key=_sort_key),
+                    "typing": sorted(delta.typing, key=_sort_key),
+                },
+                group_id,
+            )
+
+    async def heartbeat(self) -> None:
+        if not self._local:
+            return
+        now = time.time()
+        expires_at = now + settings.presence_ttl
+        groups = list(self._local.items())
+
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            for group_id, users in groups:
+                key = self._presence_key(group_id)
+                pipe.zadd(key, {str(user_id): expires_at for user_id in users})
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zremrangebyscore(self._typing_key(group_id), "-inf", now)
+            for group_id, users in groups:
+                for user_id in users:
+                    workers_key = self._workers_key(group_id, user_id)
+                    pipe.hset(workers_key, self.worker_id, expires_at)
+                    pipe.expire(workers_key, settings.presence_ttl)
+            results = await pipe.execute()
+
+        for (group_id, users), added in zip(groups, results[: 3 * len(groups) : 3]):
+            if added:
+                # Entries that had expired or been removed by another worker
+                self._delta(group_id).online.update(users)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.presence_heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except Exception:
+                logger.exception("Presence heartbeat failed")
+
+    async def _flush_loop(self) -> None:
+        interval = settings.presence_flush_interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Presence flush failed")
+
+
+presence_service = PresenceService()
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Generic, Optional, Type, TypeVar
+
+from sqlalchemy import DateTime
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.db.redis import get_redis
+from app.models.lawyer import Lawyer
+from app.models.user import User
+
+P = TypeVar("P", User, Lawyer)
+
+principal_lookups = Counter(
+    "principal_cache_lookups_total",
+    "Authenticated principal lookups by cache tier that served them",
+)
+
+# Never keep credentials in the cache, least of all in Redis.
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+
+class PrincipalCache(Generic[P]):
+    """Caches the authenticated User/Lawyer so auth needs no DB query.
+
+    Entries are column snapshots, rebuilt into transient model instances on
+    a hit. The local tier is per worker and is only invalidated on the worker
+    that made the change, so its TTL bounds staleness elsewhere; the optional
+    Redis tier is invalidated for every worker.
+    """
+
+    def __init__(self, model: Type[P], kind: str):
+        self.model = model
+        self.kind = kind
+        self._local: TTLCache[Dict[str, Any]] = TTLCache(
+            max_size=settings.principal_cache_size, ttl=settings.principal_cache_ttl
+        )
+        self._columns = [
+            attr.key
+            for attr in model.__mapper__.column_attrs
+            if attr.key not in EXCLUDED_COLUMNS
+        ]
+        self._datetime_columns = {
+            attr.key
+            for attr in model.__mapper__.column_attrs
+            if isinstance(attr.columns[0].type, DateTime)
+        }
+
+    def _redis_key(self, principal_id: int) -> str:
+        return f"principal:{self.kind}:{principal_id}"
+
+    def _snapshot(self, principal: P) -> Dict[str, Any]:
+        return {column: getattr(principal, column) for column in self._columns}
+
+    def _encode(self, snapshot: Dict[str, Any]) -> str:
+        return json.dumps(
+            snapshot,
+            default=lambda value: (
+                value.isoformat() if isinstance(value, datetime) else str(value)
+            ),
+        )
+
+    def _decode(self, raw: str) -> Dict[str, Any]:
+        snapshot = json.loads(raw)
+        for column in self._datetime_columns:
+            if snapshot.get(column):
+                snapshot[column] = datetime.fromisoformat(snapshot[column])
+        return snapshot
+
+    async def get(self, principal_id: int) -> Optional[P]:
+        snapshot = self._local.get(principal_id)
+        if snapshot is not None:
+            principal_lookups.inc(kind=self.kind, tier="local")
+            return self.model(**snapshot)
+
+        if settings.principal_cache_redis:
+            client = await get_redis()
+            raw = await client.get(self._redis_key(principal_id))
+            if raw is not None:
+                snapshot = self._decode(raw)
+                self._local.set(principal_id, snapshot)
+                principal_lookups.inc(kind=self.kind, tier="redis")
+                return self.model(**snapshot)
+
+        principal_lookups.inc(kind=self.kind, tier="miss")
+        return None
+
+    async def set(self, principal: P) -> None:
+        snapshot = self._snapshot(principal)
+        self._local.set(principal.id, snapshot)
+        if settings.principal_cache_redis:
+            client = await get_redis()
+            await client.setex(
+                self._redis_key(principal.id),
+                settings.principal_cache_ttl,
+                self._encode(snapshot),
+            )
+
+    async def invalidate(self, principal_id: int) -> None:
+        self._local.delete(principal_id)
+        if settings.principal_cache_redis:
+            client = await get_redis()
+            await client.delete(self._redis_key(principal_id))
+
+
+user_cache: PrincipalCache[User] = PrincipalCache(User, "user")
+lawyer_cache: PrincipalCache[Lawyer] = PrincipalCache(Lawyer, "lawyer")
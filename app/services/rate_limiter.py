@@ -0,0 +1,93 @@
+import time
+from typing import Union
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.redis import get_redis
+
+# Refill and spend one token atomically; state is a hash of tokens and the
+# time of the last refill, expiring once the bucket would be full again.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return allowed
+"""
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.updated_at = time.monotonic()
+
+    def take(self, rate: float, burst: int) -> bool:
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """Token bucket per member (user id or "lawyer:{id}") for inbound frames.
+
+    Buckets live in this worker's memory by default. With
+    ``websocket_rate_limit_redis`` they are kept in Redis instead, so a user
+    gets one budget across all of their sockets on every worker.
+
+    Local buckets are held in an LRU capped at
+    ``websocket_rate_limit_cache_size`` members. A bucket that is evicted, or
+    that expired after sitting full, starts over with a full burst, so the
+    cap has to cover every member connected to the worker; otherwise a busy
+    worker quietly hands out extra bursts.
+    """
+
+    def __init__(self, prefix: str = "ratelimit:ws"):
+        self.prefix = prefix
+        self._buckets: TTLCache[TokenBucket] = TTLCache(
+            max_size=settings.websocket_rate_limit_cache_size,
+            ttl=settings.websocket_rate_burst / settings.websocket_rate_limit + 1,
+        )
+        self._script = None
+
+    async def allow(self, key: Union[int, str]) -> bool:
+        rate = settings.websocket_rate_limit
+        burst = settings.websocket_rate_burst
+        if settings.websocket_rate_limit_redis:
+            return await self._allow_redis(key, rate, burst)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(burst)
+        allowed = bucket.take(rate, burst)
+        self._buckets.set(key, bucket)
+        return allowed
+
+    async def _allow_redis(self, key: Union[int, str], rate: float, burst: int) -> bool:
+        client = await get_redis()
+        if self._script is None:
+            self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+        allowed = await self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[rate, burst, time.time()],
+            client=client,
+        )
+        return bool(allowed)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+from app.db.redis import REVOCATION_CHANNEL, get_redis, is_blacklisted
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SECONDS = 60
+RESUBSCRIBE_DELAY_SECONDS = 1
+
+
+class RevocationFilter:
+    """Per-worker copy of the token blacklist, keyed by the JWT ``jti``.
+
+    The filter is loaded from the ``blacklist:*`` keys on startup and kept in
+    sync through the Redis revocation channel, so checking a token needs no
+    network round trip.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._next_prune = 0.0
+        self._listener: Optional[asyncio.Task] = None
+
+    def add(self, jti: str, expires_in: float) -> None:
+        now = time.time()
+        self._revoked[jti] = now + expires_in
+        if now >= self._next_prune:
+            self._prune(now)
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            del self._revoked[jti]
+            return False
+        return True
+
+    def _prune(self, now: float) -> None:
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in self._revoked.items()
+            if expires_at >= now
+        }
+        self._next_prune = now + PRUNE_INTERVAL_SECONDS
+
+    async def load(self) -> None:
+        client = await get_redis()
+        keys = [key async for key in client.scan_iter(match="blacklist:*", count=500)]
+        if not keys:
+            return
+
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+
+        for key, ttl in zip(keys, ttls):
+            if ttl > 0:
+                self.add(key.removeprefix("blacklist:"), ttl)
+
+    async def start(self) -> None:
+        client = await get_redis()
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        # Subscribe before loading so revocations made during the load are kept
+        await pubsub.subscribe(REVOCATION_CHANNEL)
+        await self.load()
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self, pubsub) -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self.add(data["jti"], data["expires_in"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception:
+                logger.exception("Revocation listener failed, resubscribing")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+                try:
+                    await pubsub.aclose()
+                    client = await get_redis()
+                    pubsub = client.pubsub(ignore_subscribe_messages=True)
+                    await pubsub.subscribe(REVOCATION_CHANNEL)
+                    await self.load()
+                except Exception:
+                    logger.exception("Could not resubscribe to revocations")
+
+
+revocation_filter = RevocationFilter()
+
+
+async def is_token_revoked(token: str, payload: dict) -> bool:
+    jti = payload.get("jti")
+    if jti is None:
+        # Tokens issued before jti was added are blacklisted by their full value
+        return await is_blacklisted(token)
+    return revocation_filter.is_revoked(jti)
@@ -0,0 +1,185 @@
+import json
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.db.redis import get_redis
+from app.services.message_buffer import recent_messages
+
+GROUP_SEQUENCE_KEY = "unread:group_seq"
+
+# Count a new message in the group and, when given, advance the author's read
+# sequence with it. An author without a counter is left to be seeded from the
+# DB; creating the field here would start it at 1 and show the whole group as
+# unread.
+_ON_MESSAGE_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+if KEYS[2] and redis.call('HEXISTS', KEYS[2], ARGV[1]) == 1 then
+    redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+end
+"""
+
+# Set read sequences from unread counts against the current group sequences
+# in one step, so a message published in between is not lost. ARGV holds
+# group id and unread count pairs.
+_SET_UNREAD_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local seq = tonumber(redis.call('HGET', KEYS[1], ARGV[i])) or 0
+    redis.call('HSET', KEYS[2], ARGV[i], seq - tonumber(ARGV[i + 1]))
+end
+"""
+
+# Move a read marker to a frame in the replay buffer, or to its newest frame
+# when ARGV[2] is empty. The buffer is in publish order, the order of the
+# group sequence, so the messages published after the frame are counted
+# straight from it; other users' ones are unread. The read sequence only
+# moves forward. Returns the frame and the unread count, or nil if the frame
+# is not buffered.
+_MARK_READ_SCRIPT = """
+local user_id = tonumber(ARGV[3])
+local newer = 0
+local frame = nil
+for _, entry in ipairs(redis.call('LRANGE', KEYS[3], 0, -1)) do
+    local separator = string.find(entry, ':', 1, true)
+    local payload = string.sub(entry, separator + 1)
+    if ARGV[2] == '' or string.sub(entry, 1, separator - 1) == ARGV[2] then
+        frame = payload
+        break
+    end
+    local message = cjson.decode(payload)
+    if message.author_type ~= 'user' or message.author_id ~= user_id then
+        newer = newer + 1
+    end
+end
+if frame == nil then
+    return nil
+end
+local seq = tonumber(redis.call('HGET', KEYS[1], ARGV[1])) or 0
+local read_seq = tonumber(redis.call('HGET', KEYS[2], ARGV[1]))
+if read_seq == nil or read_seq < seq - newer then
+    read_seq = seq - newer
+    redis.call('HSET', KEYS[2], ARGV[1], read_seq)
+end
+return {frame, math.max(0, seq - read_seq)}
+"""
+
+# Advance the read sequence of the given users for a deleted message they had
+# not read yet; users without a counter are left to be seeded from the DB.
+_FORGET_MESSAGE_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('HEXISTS', key, ARGV[1]) == 1 then
+        redis.call('HINCRBY', key, ARGV[1], 1)
+    end
+end
+"""
+
+
+class UnreadCounters:
+    """Unread badge counts kept incrementally in Redis hashes.
+
+    ``unread:group_seq`` maps each group to the number of messages published
+    in it, and ``unread:read:{user_id}`` maps each of the user's groups to
+    that sequence as of the user's read marker. The unread count is their
+    difference, so a new message costs one HINCRBY however many members the
+    group has, and a badge is O(1) per group. The author's read sequence is
+    advanced with their own message, so it never counts as unread for them.
+    """
+
+    def __init__(self):
+        self._on_message_script = None
+        self._set_unread_script = None
+        self._mark_read_script = None
+        self._forget_message_script = None
+
+    def _read_key(self, user_id: int) -> str:
+        return f"unread:read:{user_id}"
+
+    async def on_message(self, group_id: int, author_user_id: Optional[int]) -> None:
+        keys = [GROUP_SEQUENCE_KEY]
+        if author_user_id is not None:
+            keys.append(self._read_key(author_user_id))
+        client = await get_redis()
+        if self._on_message_script is None:
+            self._on_message_script = client.register_script(_ON_MESSAGE_SCRIPT)
+        await self._on_message_script(keys=keys, args=[group_id], client=client)
+
+    async def counts(
+        self, user_id: int, group_ids: Iterable[int]
+    ) -> Dict[int, Optional[int]]:
+        """Unread count per group, or None where the user has no counter yet."""
+        group_ids = list(group_ids)
+        if not group_ids:
+            return {}
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hmget(GROUP_SEQUENCE_KEY, group_ids)
+            pipe.hmget(self._read_key(user_id), group_ids)
+            sequences, read = await pipe.execute()
+        return {
+            group_id: (
+                None if read_seq is None else max(0, int(seq or 0) - int(read_seq))
+            )
+            for group_id, seq, read_seq in zip(group_ids, sequences, read)
+        }
+
+    async def set_unread(self, user_id: int, counts: Dict[int, int]) -> None:
+        """Store ``counts`` (e.g. from the database) as the user's unread state."""
+        if not counts:
+            return
+        client = await get_redis()
+        if self._set_unread_script is None:
+            self._set_unread_script = client.register_script(_SET_UNREAD_SCRIPT)
+        await self._set_unread_script(
+            keys=[GROUP_SEQUENCE_KEY, self._read_key(user_id)],
+            args=[value for item in counts.items() for value in item],
+            client=client,
+        )
+
+    async def mark_read(
+        self, user_id: int, group_id: int, message_id: Optional[int] = None
+    ) -> Optional[Tuple[dict, int]]:
+        """Mark read up to a recently published message, or the newest one.
+
+        Covers messages the write-behind writer has not stored yet. Returns
+        the message frame and the unread count after it, or None if the
+        message is no longer in the replay buffer.
+        """
+        client = await get_redis()
+        if self._mark_read_script is None:
+            self._mark_read_script = client.register_script(_MARK_READ_SCRIPT)
+        result = await self._mark_read_script(
+            keys=[
+                GROUP_SEQUENCE_KEY,
+                self._read_key(user_id),
+                recent_messages.key(group_id),
+            ],
+            args=[group_id, "" if message_id is None else message_id, user_id],
+            client=client,
+        )
+        if result is None:
+            return None
+        frame, unread = result
+        return json.loads(frame), int(unread)
+
+    async def forget_message(self, group_id: int, user_ids: Iterable[int]) -> None:
+        """Drop a deleted message from the counts of users who had not read it.
+
+        The group sequence keeps counting it, so users who had already read
+        it stay where they are.
+        """
+        keys = [self._read_key(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        client = await get_redis()
+        if self._forget_message_script is None:
+            self._forget_message_script = client.register_script(_FORGET_MESSAGE_SCRIPT)
+        await self._forget_message_script(keys=keys, args=[group_id], client=client)
+
+    async def forget(self, user_id: int, group_id: int) -> None:
+        client = await get_redis()
+        await client.hdel(self._read_key(user_id), group_id)
+
+    async def clear_group(self, group_id: int) -> None:
+        client = await get_redis()
+        await client.hdel(GROUP_SEQUENCE_KEY, group_id)
+
+
+unread_counters = UnreadCounters()
@@ -1,22 +1,24 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundException
 from app.models.user import User
 from app.schemas.user import ProfileUpdate, UsernameUpdate
+from app.services.principal_cache import user_cache
 
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.username == username).first()
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.username == username))
 
-    def update_profile(self, user_id: int, profile_update: ProfileUpdate) -> User:
-        db_user = self.db.query(User).filter(User.id == user_id).first()
+    async def update_profile(self, user_id: int, profile_update: ProfileUpdate) -> User:
+        db_user = await self.db.get(User, user_id)
         if not db_user:
             raise NotFoundException("User not found")
 
@@ -24,18 +26,22 @@ class UserService:
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        await user_cache.invalidate(user_id)
         return db_user
 
-    def update_username(self, user_id: int, username_update: UsernameUpdate) -> User:
-        db_user = self.db.query(User).filter(User.id == user_id).first()
+    async def update_username(
+        self, user_id: int, username_update: UsernameUpdate
+    ) -> User:
+        db_user = await self.db.get(User, user_id)
         if not db_user:
             raise NotFoundException("User not found")
 
         setattr(db_user, "username", username_update.username)
         setattr(db_user, "username_changed_at", datetime.now(timezone.utc))
 
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        await user_cache.invalidate(user_id)
         return db_user
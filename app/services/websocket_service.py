@@ -1,31 +1,394 @@
-from typing import Dict, List
-from fastapi import WebSocket
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Union
+
+from fastapi import WebSocket, status
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.services.broker import Broker, create_broker
+from app.services.wire_format import encode
+
+logger = logging.getLogger(__name__)
+
+MembershipHandler = Callable[["Connection", int, bool], Awaitable[None]]
+
+queued_messages = Gauge(
+    "websocket_outbound_queued_messages",
+    "Messages waiting in per-connection outbound queues",
+)
+dropped_clients = Counter(
+    "websocket_dropped_clients_total",
+    "Connections evicted for overflowing their queue, timing out or going idle",
+)
+live_connections = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections on this worker",
+)
+fanout_seconds = Histogram(
+    "websocket_fanout_seconds",
+    "Time to enqueue one broadcast for every local connection in a channel",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+
+
+class CloseFrame:
+    """Queued after a connection's last frame to close it once flushed."""
+
+    __slots__ = ("code", "reason")
+
+    def __init__(self, code: int, reason: str = ""):
+        self.code = code
+        self.reason = reason
+
+
+class Connection:
+    """A socket plus its bounded outbound queue and writer task.
+
+    Outbound frames are queued already encoded for the connection's
+    negotiated ``encoding``. ``channels`` keeps the groups the socket was
+    subscribed to even after ``disconnect``, so the endpoint can release
+    presence on any exit path. Multiplexed sockets also follow the user's
+    membership changes through the ``user:{id}`` channel.
+    """
+
+    __slots__ = (
+        "websocket",
+        "user_id",
+        "channels",
+        "follow_membership",
+        "encoding",
+        "queue",
+        "writer",
+        "closed",
+        "last_activity",
+        "violations",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: Optional[int] = None,
+        follow_membership: bool = False,
+        encoding: str = "json",
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.channels: Set[int] = set()
+        self.follow_membership = follow_membership
+        self.encoding = encoding
+        self.queue: asyncio.Queue[Union[str, bytes, CloseFrame]] = asyncio.Queue(
+            maxsize=settings.websocket_send_queue_size
+        )
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.last_activity = time.monotonic()
+        self.violations = 0
 
 
 class ConnectionManager:
-    def __init__(self):
-        # Store active connections by channel_id
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, broker: Broker):
+        # Store this worker's connections by channel_id; the broker carries
+        # broadcasts between workers
+        self.active_connections: Dict[int, Set[Connection]] = {}
+        self.user_connections: Dict[int, Set[Connection]] = {}
+        self.connections: Set[Connection] = set()
+        self.broker = broker
+        self.on_membership_change: Optional[MembershipHandler] = None
+        self.draining = False
+        self._reaper: Optional[asyncio.Task] = None
+        # Close handshakes still in flight, so drain can wait for them
+        self._closing: Set[asyncio.Task] = set()
+
+    async def start(self):
+        self.draining = False
+        await self.broker.start(self._deliver)
+        self._reaper = asyncio.create_task(self._heartbeat_loop())
 
-    async def connect(self, websocket: WebSocket, channel_id: int):
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        await self.broker.stop()
+
+    def _channel(self, channel_id: int) -> str:
+        return f"group:{channel_id}"
+
+    def _user_channel(self, user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def accept(
+        self,
+        websocket: WebSocket,
+        user_id: Optional[int] = None,
+        follow_membership: bool = False,
+        encoding: str = "json",
+    ) -> Connection:
         await websocket.accept()
+        connection = Connection(websocket, user_id, follow_membership, encoding)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections.add(connection)
+        live_connections.inc()
+        if follow_membership and user_id is not None:
+            if user_id not in self.user_connections:
+                self.user_connections[user_id] = set()
+                await self.broker.subscribe(self._user_channel(user_id))
+            self.user_connections[user_id].add(connection)
+        return connection
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        channel_id: int,
+        user_id: Optional[int] = None,
+        encoding: str = "json",
+    ) -> Connection:
+        connection = await self.accept(websocket, user_id, encoding=encoding)
+        await self.subscribe(connection, channel_id)
+        return connection
+
+    def touch(self, connection: Connection):
+        connection.last_activity = time.monotonic()
+
+    async def subscribe(self, connection: Connection, channel_id: int):
+        if connection.closed or channel_id in connection.channels:
+            return
+        connection.channels.add(channel_id)
         if channel_id not in self.active_connections:
-            self.active_connections[channel_id] = []
-        self.active_connections[channel_id].append(websocket)
+            self.active_connections[channel_id] = set()
+            await self.broker.subscribe(self._channel(channel_id))
+        self.active_connections[channel_id].add(connection)
+
+    async def unsubscribe(self, connection: Connection, channel_id: int):
+        if channel_id not in connection.channels:
+            return
+        connection.channels.discard(channel_id)
+        await self._remove(connection, channel_id)
+
+    async def _remove(self, connection: Connection, channel_id: int):
+        connections = self.active_connections.get(channel_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self.active_connections[channel_id]
+            await self.broker.unsubscribe(self._channel(channel_id))
+
+    async def disconnect(self, connection: Connection):
+        if connection.closed:
+            return
+        connection.closed = True
+        if connection.writer is not None and connection.writer is not (
+            asyncio.current_task()
+        ):
+            connection.writer.cancel()
+        queued_messages.dec(connection.queue.qsize())
+        self.connections.discard(connection)
+        live_connections.dec()
+
+        for channel_id in connection.channels:
+            await self._remove(connection, channel_id)
 
-    def disconnect(self, websocket: WebSocket, channel_id: int):
-        if channel_id in self.active_connections:
-            self.active_connections[channel_id].remove(websocket)
-            if not self.active_connections[channel_id]:
-                del self.active_connections[channel_id]
+        user_connections = self.user_connections.get(connection.user_id)
+        if connection.follow_membership and user_connections is not None:
+            user_connections.discard(connection)
+            if not user_connections:
+                del self.user_connections[connection.user_id]
+                await self.broker.unsubscribe(self._user_channel(connection.user_id))
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
+    async def send(self, connection: Connection, message: dict):
+        await self.send_payload(connection, json.dumps(message))
+
+    async def send_payload(self, connection: Connection, payload: str):
+        # Goes through the writer queue so it stays ordered with broadcasts
+        try:
+            connection.queue.put_nowait(encode(payload, connection.encoding))
+            queued_messages.inc()
+        except asyncio.QueueFull:
+            await self._evict(connection, "overflow")
+
     async def broadcast(self, message: dict, channel_id: int):
-        if channel_id in self.active_connections:
-            for connection in self.active_connections[channel_id]:
-                await connection.send_json(message)
+        # Serialized once here; every worker and socket reuses the same text
+        await self.publish(json.dumps(message), channel_id)
+
+    async def publish(self, payload: str, channel_id: int):
+        await self.broker.publish(self._channel(channel_id), payload)
+
+    async def notify_membership(self, user_id: int, group_id: int, joined: bool):
+        """Tell the user's multiplexed sockets, on any worker, to follow a group."""
+        event = {
+            "type": "membership",
+            "group_id": group_id,
+            "action": "join" if joined else "leave",
+        }
+        await self.broker.publish(self._user_channel(user_id), json.dumps(event))
+
+    async def _deliver(self, channel: str, payload: str):
+        if channel.startswith("user:"):
+            await self._deliver_membership(int(channel.removeprefix("user:")), payload)
+            return
+
+        channel_id = int(channel.removeprefix("group:"))
+        started = time.perf_counter()
+        queued = 0
+        # Encode once per format per message, not once per socket
+        encoded: Dict[str, Union[str, bytes]] = {"json": payload}
+        for connection in list(self.active_connections.get(channel_id, ())):
+            frame = encoded.get(connection.encoding)
+            if frame is None:
+                frame = encoded[connection.encoding] = encode(
+                    payload, connection.encoding
+                )
+            try:
+                connection.queue.put_nowait(frame)
+                queued += 1
+            except asyncio.QueueFull:
+                await self._evict(connection, "overflow")
+        queued_messages.inc(queued)
+        fanout_seconds.observe(time.perf_counter() - started)
+
+    async def _deliver_membership(self, user_id: int, payload: str):
+        event = json.loads(payload)
+        group_id = event["group_id"]
+        joined = event["action"] == "join"
+        for connection in list(self.user_connections.get(user_id, ())):
+            if (group_id in connection.channels) == joined:
+                continue
+            if joined:
+                await self.subscribe(connection, group_id)
+            else:
+                await self.unsubscribe(connection, group_id)
+            if self.on_membership_change is not None:
+                await self.on_membership_change(connection, group_id, joined)
+            await self.send_payload(connection, payload)
+
+    async def _write(self, connection: Connection):
+        while True:
+            frame = await connection.queue.get()
+            queued_messages.dec()
+            if isinstance(frame, CloseFrame):
+                await self.disconnect(connection)
+                await self._close(connection.websocket, frame.code, frame.reason)
+                return
+            if isinstance(frame, str):
+                send = connection.websocket.send_text(frame)
+            else:
+                send = connection.websocket.send_bytes(frame)
+            try:
+                await asyncio.wait_for(
+                    send,
+                    timeout=settings.websocket_send_timeout,
+                )
+            except asyncio.TimeoutError:
+                await self._evict(connection, "timeout")
+                return
+            except Exception:
+                # The reader side sees the disconnect and cleans up
+                await self.disconnect(connection)
+                return
+
+    async def drain(self, timeout: float):
+        """Close every connection after flushing its queue, within ``timeout``.
+
+        New connections are refused from here on. Each client gets a
+        reconnect frame with a random delay up to
+        ``shutdown_reconnect_jitter`` and a 1012 close carrying the same
+        hint, so a rolling restart does not bring every client back at once.
+        Up to half of ``timeout`` is kept back for closing the sockets whose
+        writers did not get through their queue in time.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.draining = True
+        writers = []
+        for connection in list(self.connections):
+            retry_after_ms = int(
+                random.uniform(0, settings.shutdown_reconnect_jitter) * 1000
+            )
+            await self.send(
+                connection, {"type": "reconnect", "retry_after_ms": retry_after_ms}
+            )
+            if connection.closed:
+                continue
+            try:
+                connection.queue.put_nowait(
+                    CloseFrame(
+                        status.WS_1012_SERVICE_RESTART,
+                        f"retry_after_ms={retry_after_ms}",
+                    )
+                )
+                queued_messages.inc()
+            except asyncio.QueueFull:
+                await self._evict(connection, "overflow")
+                continue
+            writers.append(connection.writer)
+
+        close_budget = min(settings.websocket_send_timeout, timeout / 2)
+        if writers:
+            await asyncio.wait(
+                writers, timeout=max(0, deadline - close_budget - loop.time())
+            )
+        for connection in list(self.connections):
+            await self.disconnect(connection)
+            self._close_later(connection.websocket, status.WS_1012_SERVICE_RESTART)
+        if self._closing:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*self._closing, return_exceptions=True),
+                    timeout=max(0, deadline - loop.time()),
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Gave up on %d websocket closes at the drain deadline",
+                    len(self._closing),
+                )
+
+    async def _heartbeat_loop(self):
+        ping = json.dumps({"type": "ping"})
+        while True:
+            await asyncio.sleep(settings.websocket_ping_interval)
+            try:
+                # Any inbound frame counts as activity; clients answer the
+                # ping with a pong, so a half-open socket goes quiet and is
+                # reaped after the idle timeout.
+                deadline = time.monotonic() - settings.websocket_idle_timeout
+                for connection in list(self.connections):
+                    if connection.last_activity < deadline:
+                        await self._evict(connection, "idle")
+                    else:
+                        await self.send_payload(connection, ping)
+            except Exception:
+                logger.exception("WebSocket heartbeat failed")
+
+    async def _evict(self, connection: Connection, reason: str):
+        if connection.closed:
+            return
+        dropped_clients.inc(reason=reason)
+        await self.disconnect(connection)
+        self._close_later(connection.websocket, status.WS_1013_TRY_AGAIN_LATER)
+
+    def _close_later(self, websocket: WebSocket, code: int) -> None:
+        # Never awaited by the caller, which may be the writer of the very
+        # socket being closed; tracked so drain can wait for it instead
+        task = asyncio.create_task(self._close(websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket, code: int, reason: str = ""):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=code, reason=reason),
+                timeout=settings.websocket_send_timeout,
+            )
+        except Exception:
+            logger.debug("Could not close websocket", exc_info=True)
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(create_broker())
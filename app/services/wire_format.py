@@ -0,0 +1,76 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Union
+
+ENCODINGS = ("json", "msgpack", "deflate")
+
+# Top-level frame fields sent as integer epoch milliseconds in msgpack
+_TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise RuntimeError(
+            "The msgpack encoding requires the 'msgpack' extra to be installed"
+        ) from exc
+    return msgpack
+
+
+def msgpack_available() -> bool:
+    try:
+        _msgpack()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _compact(frame: Any) -> Any:
+    if not isinstance(frame, dict):
+        return frame
+    for field in _TIMESTAMP_FIELDS:
+        value = frame.get(field)
+        if isinstance(value, str):
+            frame[field] = int(datetime.fromisoformat(value).timestamp() * 1000)
+    return frame
+
+
+def _event(payload: str) -> str:
+    frame = json.loads(payload)
+    lines = [f"event: {frame.get('type', 'message')}", f"data: {payload}"]
+    if frame.get("type") == "message":
+        # Lets EventSource resume with Last-Event-ID after a reconnect
+        lines.insert(0, f"id: {frame['id']}")
+    elif frame.get("type") == "reconnect":
+        # EventSource waits this long before reconnecting
+        lines.insert(0, f"retry: {frame['retry_after_ms']}")
+    return "\n".join(lines) + "\n\n"
+
+
+def encode(payload: str, encoding: str) -> Union[str, bytes]:
+    """Re-encode a JSON text frame for a connection's negotiated encoding.
+
+    JSON frames go out as text unchanged. msgpack and deflate frames are
+    binary; deflate is raw DEFLATE over the JSON text, compressed once per
+    message rather than per socket as permessage-deflate would. ``sse`` is
+    the text/event-stream form used by the read-only stream endpoint.
+    """
+    if encoding == "json":
+        return payload
+    if encoding == "msgpack":
+        return _msgpack().packb(_compact(json.loads(payload)))
+    if encoding == "sse":
+        return _event(payload)
+    if encoding == "deflate":
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        return compressor.compress(payload.encode()) + compressor.flush()
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+
+def decode(data: bytes, encoding: str) -> Any:
+    """Decode a binary inbound frame; only msgpack clients send binary."""
+    if encoding == "msgpack":
+        return _msgpack().unpackb(data)
+    raise ValueError(f"Binary frames are not accepted with {encoding} encoding")
@@ -1,17 +1,92 @@
+import asyncio
+import signal
+import threading
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.api import auth, groups, lawyer_auth, lawyers, users, websocket
+from app.api import auth, groups, lawyer_auth, lawyers, stream, users, websocket
+from app.core.config import settings
+from app.core.deps import require_metrics_access
+from app.core.hashing import password_hasher
+from app.core.metrics import render_metrics
 from app.db.redis import close_redis, get_redis
+from app.services.message_writer import message_writer
+from app.services.partition_service import partition_maintainer
+from app.services.presence_service import presence_service
+from app.services.revocation_service import revocation_filter
+from app.services.websocket_service import manager
+
+
+async def drain():
+    # Refuse new sockets, close open ones after flushing their queues, then
+    # persist everything the write-behind writer still holds
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.shutdown_drain_timeout
+    await manager.drain(settings.shutdown_drain_timeout)
+    try:
+        await asyncio.wait_for(
+            message_writer.stop(), timeout=max(0.0, deadline - loop.time())
+        )
+    except asyncio.TimeoutError:
+        pass
+
+
+def drain_before_exit(signum: int):
+    """Run ``drain`` before handing the signal to the server's own handler.
+
+    The server closes every socket abruptly as soon as it starts shutting
+    down, before the lifespan shutdown runs, so draining has to start from
+    the signal itself.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signum)
+    if previous is None:
+        previous = signal.SIG_DFL
+    tasks = set()
+
+    async def drain_then_exit(frame):
+        await drain()
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            signal.raise_signal(signum)
+
+    def handler(sig, frame):
+        # A second signal goes straight to the server
+        signal.signal(signum, previous)
+        task = loop.create_task(drain_then_exit(frame))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    signal.signal(
+        signum, lambda sig, frame: loop.call_soon_threadsafe(handler, sig, frame)
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await get_redis()
+    await revocation_filter.start()
+    await partition_maintainer.start()
+    await message_writer.start()
+    await manager.start()
+    await presence_service.start()
+    drain_before_exit(signal.SIGTERM)
+    drain_before_exit(signal.SIGINT)
     yield
+    await drain()
+    await presence_service.stop()
+    await manager.stop()
+    await message_writer.stop()
+    await partition_maintainer.stop()
+    await revocation_filter.stop()
     await close_redis()
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="LINKA Backend API", version="0.1.0", lifespan=lifespan)
@@ -29,9 +104,20 @@ app.include_router(lawyer_auth.router, prefix="/api/lawyer-auth", tags=["lawyer-
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(lawyers.router, prefix="/api/lawyers", tags=["lawyers"])
 app.include_router(groups.router, prefix="/api/groups", tags=["groups"])
+app.include_router(stream.router, prefix="/api/groups", tags=["stream"])
 app.include_router(websocket.router, prefix="/api/ws", tags=["websocket"])
 
 
 @app.get("/")
 async def root():
-    return {"message": "LINKA Backend API"}
\ No newline at end of file
+    return {"message": "LINKA Backend API"}
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_access)],
+)
+async def metrics():
+    return render_metrics()
@@ -0,0 +1,137 @@
+"""Archive monthly group_messages partitions older than the retention window.
+
+Each partition whose month ended more than --retention-months ago (default
+MESSAGE_RETENTION_MONTHS) is detached from group_messages, exported as
+gzip-compressed CSV to --output-dir and dropped once the export is
+complete:
+
+    uv run python -m scripts.archive_messages --output-dir /var/backups/chat
+    uv run python -m scripts.archive_messages --retention-months 12 --dry-run
+
+A partition stays detached but undropped if its export fails, and is picked
+up again on the next run. Exports can be restored with COPY ... FROM into a
+partition created by create_group_messages_partition. Postgres only.
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, Tuple
+
+from app.core.config import settings
+from app.db.database import engine
+from app.services.message_page_cache import first_page_cache
+
+PARTITION_NAME = re.compile(r"^group_messages_(\d{4})_(\d{2})$")
+
+COLUMNS = "id, content, group_id, author_id, lawyer_author_id, created_at, updated_at"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def cold_partitions(connection, cutoff: date) -> List[Tuple[str, bool]]:
+    """(name, attached) for monthly partitions that ended before ``cutoff``."""
+    rows = await connection.fetch("""
+        SELECT c.relname, i.inhrelid IS NOT NULL AS attached
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+        WHERE c.relkind = 'r'
+          AND n.nspname = current_schema()
+          AND c.relname LIKE 'group\\_messages\\_%'
+        ORDER BY c.relname
+        """)
+    partitions = []
+    for row in rows:
+        match = PARTITION_NAME.match(row["relname"])
+        if match is None:
+            continue
+        month = date(int(match[1]), int(match[2]), 1)
+        if add_months(month, 1) <= cutoff:
+            partitions.append((row["relname"], row["attached"]))
+    return partitions
+
+
+async def export(connection, name: str, output_dir: str) -> Tuple[str, int]:
+    """Write the partition to ``{name}.csv.gz``; return the path and row count."""
+    path = os.path.join(output_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    with open(partial, "wb") as file:
+        with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+
+            async def write(chunk: bytes) -> None:
+                archive.write(chunk)
+
+            status = await connection.copy_from_query(
+                f'SELECT {COLUMNS} FROM "{name}"',
+                output=write,
+                format="csv",
+                header=True,
+            )
+        # The partition is dropped next, so the export must be on disk
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+    return path, int(status.split()[-1])
+
+
+async def archive(retention_months: int, output_dir: str, dry_run: bool) -> None:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Only the partitioned Postgres table can be archived")
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    cutoff = add_months(this_month, -retention_months)
+    os.makedirs(output_dir, exist_ok=True)
+
+    async with engine.connect() as sa_connection:
+        raw = await sa_connection.get_raw_connection()
+        connection = raw.driver_connection
+        partitions = await cold_partitions(connection, cutoff)
+        print(f"retention          {retention_months} months (before {cutoff})")
+        if not partitions:
+            print("nothing to archive")
+        for name, attached in partitions:
+            if dry_run:
+                rows = await connection.fetchval(f'SELECT count(*) FROM "{name}"')
+                print(f"would archive      {name} ({rows} rows)")
+                continue
+
+            if attached:
+                # Plain DETACH: CONCURRENTLY is not allowed alongside the
+                # default partition. Only takes a brief lock on the parent.
+                await connection.execute(
+                    f'ALTER TABLE group_messages DETACH PARTITION "{name}"'
+                )
+            rows = await connection.fetchval(f'SELECT count(*) FROM "{name}"')
+            path, exported = await export(connection, name, output_dir)
+            if exported != rows:
+                raise SystemExit(f"{name}: exported {exported} of {rows} rows")
+            group_ids = await connection.fetch(
+                f'SELECT DISTINCT group_id FROM "{name}"'
+            )
+            await connection.execute(f'DROP TABLE "{name}"')
+            # Quiet groups may still serve archived messages as their first page
+            for row in group_ids:
+                await first_page_cache.invalidate(row["group_id"])
+            print(f"archived           {name} ({rows} rows) -> {path}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--retention-months", type=int, default=settings.message_retention_months
+    )
+    parser.add_argument("--output-dir", default="archive")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(archive(args.retention_months, args.output_dir, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure broadcast fan-out latency from ConnectionManager to N sockets.
+
+Runs entirely in-process with a local broker and stub sockets, so it
+isolates the manager's queueing and writer tasks from the network:
+
+    uv run python -m scripts.bench_fanout --sockets 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.broker import LocalBroker
+from app.services.websocket_service import ConnectionManager
+
+
+class StubWebSocket:
+    def __init__(self, received: list, delay: float = 0.0):
+        self.received = received
+        self.delay = delay
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(time.perf_counter())
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument(
+        "--slow", type=int, default=0, help="sockets that take 1s per send"
+    )
+    args = parser.parse_args()
+
+    manager = ConnectionManager(LocalBroker())
+    await manager.start()
+    received: list[float] = []
+    for index in range(args.sockets):
+        delay = 1.0 if index < args.slow else 0.0
+        await manager.connect(StubWebSocket(received, delay), channel_id=1)
+
+    fast = args.sockets - args.slow
+    last_delivery, all_delivery = [], []
+    for _ in range(args.broadcasts):
+        received.clear()
+        started = time.perf_counter()
+        await manager.broadcast({"content": "x" * 200}, 1)
+        while len(received) < fast:
+            await asyncio.sleep(0)
+        all_delivery.extend((t - started) * 1000 for t in received)
+        last_delivery.append((max(received) - started) * 1000)
+
+    all_delivery.sort()
+    print(f"sockets           {args.sockets} ({args.slow} slow)")
+    print(f"median delivery   {statistics.median(all_delivery):.2f} ms")
+    print(f"p99 delivery      {all_delivery[int(len(all_delivery) * 0.99)]:.2f} ms")
+    print(f"last socket mean  {statistics.mean(last_delivery):.2f} ms")
+    await manager.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Measure latency of concurrent GET /api/groups/{id}/messages requests.
+
+Run it against a live server before and after a change and compare the
+percentiles:
+
+    uv run python -m scripts.bench_messages --token <jwt> --group-id 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def worker(
+    client: httpx.AsyncClient, url: str, requests: int, samples: list[float]
+) -> None:
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--group-id", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="per worker")
+    args = parser.parse_args()
+
+    url = f"/api/groups/{args.group_id}/messages"
+    samples: list[float] = []
+    headers = {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, limits=limits
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(client, url, args.requests, samples)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"requests    {len(samples)}")
+    print(f"throughput  {len(samples) / elapsed:.1f} req/s")
+    print(f"mean        {statistics.mean(samples):.2f} ms")
+    for pct in (50, 95, 99):
+        print(f"p{pct:<10} {percentile(samples, pct):.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""Compare OFFSET and keyset pagination of group messages at increasing depth.
+
+Seeds one group with --messages rows (Postgres only) and times the first
+page returned at each depth by both strategies:
+
+    uv run python -m scripts.bench_pagination --messages 1000000
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, select, text
+
+from app.db.database import AsyncSessionLocal
+from app.models.group import Group, GroupMessage
+from app.models.user import User
+from app.services.group_service import GroupService
+
+DEPTHS = (0, 1_000, 10_000, 100_000, 500_000, 900_000)
+
+
+async def seed(messages: int) -> tuple[int, int]:
+    async with AsyncSessionLocal() as db:
+        user = User(username=f"bench-{time.time_ns()}", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        group = Group(name="pagination benchmark", owner_id=user.id)
+        db.add(group)
+        await db.flush()
+        await db.execute(
+            text("""
+                INSERT INTO group_messages
+                    (content, group_id, author_id, created_at, updated_at)
+                SELECT 'message ' || n, :group_id, :user_id,
+                       now() - n * interval '1 second',
+                       now() - n * interval '1 second'
+                FROM generate_series(1, :messages) AS n
+            """),
+            {"group_id": group.id, "user_id": user.id, "messages": messages},
+        )
+        await db.commit()
+        await db.execute(text("ANALYZE group_messages"))
+        return user.id, group.id
+
+
+async def time_query(coro_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    user_id, group_id = await seed(args.messages)
+    print(f"seeded {args.messages} messages in group {group_id}")
+    print(f"{'depth':>10} {'offset ms':>12} {'keyset ms':>12}")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            service = GroupService(db)
+            for depth in (d for d in DEPTHS if d < args.messages):
+                # Key of the row just above the page, as a client cursor would hold
+                before = None
+                if depth:
+                    before = (
+                        await db.execute(
+                            select(GroupMessage.created_at, GroupMessage.id)
+                            .where(GroupMessage.group_id == group_id)
+                            .order_by(
+                                GroupMessage.created_at.desc(), GroupMessage.id.desc()
+                            )
+                            .offset(depth - 1)
+                            .limit(1)
+                        )
+                    ).one()
+
+                offset_ms = await time_query(
+                    lambda: db.scalars(
+                        select(GroupMessage)
+                        .where(GroupMessage.group_id == group_id)
+                        .order_by(GroupMessage.created_at.desc())
+                        .offset(depth)
+                        .limit(args.limit)
+                    ),
+                    args.repeat,
+                )
+                keyset_ms = await time_query(
+                    lambda: service.get_group_messages(
+                        group_id, args.limit, before=before
+                    ),
+                    args.repeat,
+                )
+                print(f"{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Group).where(Group.id == group_id))
+                await db.execute(delete(User).where(User.id == user_id))
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""Compare the one-query group sidebar against per-group follow-up queries.
+
+Seeds one user in --groups groups with --messages rows each and times
+building the sidebar both ways: the old pattern (list the groups, then a
+member count, last message and unread count query per group) and
+GroupService.get_sidebar:
+
+    uv run python -m scripts.bench_sidebar --groups 250 --messages 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, tuple_
+
+from app.db.database import AsyncSessionLocal
+from app.models.group import Group, GroupMessage
+from app.models.user import User, user_groups
+from app.services.group_service import GroupService
+
+
+async def seed(groups: int, messages: int) -> tuple[int, int]:
+    async with AsyncSessionLocal() as db:
+        user = User(username=f"bench-{time.time_ns()}", hashed_password="-")
+        other = User(username=f"bench-other-{time.time_ns()}", hashed_password="-")
+        db.add_all([user, other])
+        await db.flush()
+        rows = [Group(name=f"sidebar {n}", owner_id=other.id) for n in range(groups)]
+        db.add_all(rows)
+        await db.flush()
+
+        now = datetime.now(timezone.utc)
+        for group in rows:
+            await db.execute(
+                insert(user_groups),
+                [
+                    {"group_id": group.id, "user_id": user.id},
+                    {"group_id": group.id, "user_id": other.id},
+                ],
+            )
+            await db.execute(
+                insert(GroupMessage),
+                [
+                    {
+                        "content": f"message {n}",
+                        "group_id": group.id,
+                        "author_id": other.id,
+                        "created_at": now - timedelta(seconds=n),
+                        "updated_at": now - timedelta(seconds=n),
+                    }
+                    for n in range(messages)
+                ],
+            )
+        # Read up to the middle of each group's history
+        read_at = now - timedelta(seconds=messages // 2)
+        await db.execute(
+            user_groups.update()
+            .where(user_groups.c.user_id == user.id)
+            .values(last_read_at=read_at, last_read_message_id=0)
+        )
+        await db.commit()
+        return user.id, other.id
+
+
+async def per_group_sidebar(db, user_id: int) -> int:
+    service = GroupService(db)
+    queries = 1
+    for group in await service.get_user_groups(user_id):
+        await db.scalar(
+            select(func.count())
+            .select_from(user_groups)
+            .where(user_groups.c.group_id == group.id)
+        )
+        await db.scalar(
+            select(GroupMessage)
+            .where(GroupMessage.group_id == group.id)
+            .order_by(GroupMessage.created_at.desc(), GroupMessage.id.desc())
+            .limit(1)
+        )
+        marker = (
+            await db.execute(
+                select(
+                    user_groups.c.last_read_at, user_groups.c.last_read_message_id
+                ).where(
+                    user_groups.c.group_id == group.id,
+                    user_groups.c.user_id == user_id,
+                )
+            )
+        ).one()
+        await db.scalar(
+            select(func.count())
+            .select_from(GroupMessage)
+            .where(
+                GroupMessage.group_id == group.id,
+                tuple_(GroupMessage.created_at, GroupMessage.id) > tuple_(*marker),
+            )
+        )
+        queries += 4
+    return queries
+
+
+async def time_call(coro_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=250)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    user_id, other_id = await seed(args.groups, args.messages)
+    print(f"seeded {args.groups} groups x {args.messages} messages")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            queries = await per_group_sidebar(db, user_id)
+            per_group_ms = await time_call(
+                lambda: per_group_sidebar(db, user_id), args.repeat
+            )
+            service = GroupService(db)
+            sidebar_ms = await time_call(
+                lambda: service.get_sidebar(user_id), args.repeat
+            )
+        print(f"{'strategy':<12} {'queries':>8} {'median ms':>10}")
+        print(f"{'per-group':<12} {queries:>8} {per_group_ms:>10.2f}")
+        print(f"{'sidebar':<12} {1:>8} {sidebar_ms:>10.2f}")
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Group).where(Group.owner_id == other_id))
+                await db.execute(delete(User).where(User.id.in_([user_id, other_id])))
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
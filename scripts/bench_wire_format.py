@@ -0,0 +1,120 @@
+"""Compare chat frame encodings: bytes on the wire and CPU per 1k broadcasts.
+
+Broadcasts a typical message frame through ConnectionManager to stub
+sockets that all negotiated the same encoding, so each run includes the
+once-per-message encode plus the per-socket queueing. The last row shows
+what per-socket compression (how permessage-deflate works) would cost:
+
+    uv run python -m scripts.bench_wire_format --sockets 100
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import zlib
+from datetime import datetime, timezone
+
+from app.services.broker import LocalBroker
+from app.services.websocket_service import ConnectionManager
+from app.services.wire_format import ENCODINGS, encode, msgpack_available
+
+
+class StubWebSocket:
+    def __init__(self):
+        self.sent_bytes = 0
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        self.sent_bytes += len(payload.encode())
+        self.frames += 1
+
+    async def send_bytes(self, payload: bytes):
+        self.sent_bytes += len(payload)
+        self.frames += 1
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+def sample_frame(index: int) -> dict:
+    return {
+        "type": "message",
+        "group_id": 1,
+        "id": 1_000_000 + index,
+        "content": "Running ten minutes late, start without me please",
+        "author_id": 4821,
+        "author_username": "maria.fernandes",
+        "author_display_name": "Maria Fernandes",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def encode_cpu(encoding: str, broadcasts: int) -> float:
+    payloads = [json.dumps(sample_frame(index)) for index in range(broadcasts)]
+    started = time.process_time()
+    for payload in payloads:
+        encode(payload, encoding)
+    return (time.process_time() - started) * 1000 / broadcasts * 1000
+
+
+async def run(encoding: str, sockets: int, broadcasts: int) -> tuple[float, float]:
+    manager = ConnectionManager(LocalBroker())
+    await manager.start()
+    stubs = [StubWebSocket() for _ in range(sockets)]
+    for stub in stubs:
+        await manager.connect(stub, channel_id=1, encoding=encoding)
+
+    started = time.process_time()
+    for index in range(broadcasts):
+        await manager.broadcast(sample_frame(index), 1)
+        while stubs[-1].frames < index + 1:
+            await asyncio.sleep(0)
+    cpu = time.process_time() - started
+
+    await manager.stop()
+    total_bytes = sum(stub.sent_bytes for stub in stubs)
+    return total_bytes / (sockets * broadcasts), cpu * 1000 / broadcasts * 1000
+
+
+def per_socket_deflate(sockets: int, broadcasts: int) -> tuple[float, float]:
+    # permessage-deflate keeps a compressor per socket and compresses each
+    # frame for every recipient
+    compressors = [zlib.compressobj(wbits=-zlib.MAX_WBITS) for _ in range(sockets)]
+    total_bytes = 0
+    started = time.process_time()
+    for index in range(broadcasts):
+        payload = json.dumps(sample_frame(index)).encode()
+        for compressor in compressors:
+            total_bytes += len(
+                compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            )
+    cpu = time.process_time() - started
+    return total_bytes / (sockets * broadcasts), cpu * 1000 / broadcasts * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=100)
+    parser.add_argument("--broadcasts", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'encoding':<22}{'bytes/frame':>12}{'cpu ms/1k':>12}{'encode ms/1k':>14}")
+    for encoding in ENCODINGS:
+        if encoding == "msgpack" and not msgpack_available():
+            print(f"{encoding:<22}{'(msgpack not installed)':>24}")
+            continue
+        size, cpu = await run(encoding, args.sockets, args.broadcasts)
+        encode_ms = encode_cpu(encoding, args.broadcasts)
+        print(f"{encoding:<22}{size:>12.1f}{cpu:>12.1f}{encode_ms:>14.2f}")
+
+    size, cpu = per_socket_deflate(args.sockets, args.broadcasts)
+    print(f"{'per-socket deflate':<22}{size:>12.1f}{cpu:>12.1f}{cpu:>14.2f}")
+    print(f"sockets {args.sockets}, broadcasts {args.broadcasts}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
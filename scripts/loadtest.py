@@ -0,0 +1,326 @@
+"""Load-test the chat WebSocket path against a local worker.
+
+Starts the app in a child process with local stand-ins (SQLite by default,
+an in-process fake Redis), seeds users and groups, opens N authenticated
+sockets across M groups through /api/ws/{group_id} and drives a fixed
+message rate. Reports connect rate, end-to-end fan-out latency, server
+memory per socket and DB commits per second:
+
+    uv run python -m scripts.loadtest --sockets 1000 --groups 50 --rate 200
+
+Messages are sent over the sockets by default, which exercises the
+write-behind writer; --send-via http posts them through the REST endpoint
+and GroupService.create_message instead. Requires the dev extras
+(fakeredis, aiosqlite, httpx) and the websockets client.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from itertools import cycle
+from typing import Dict, List, Optional
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=25)
+    parser.add_argument(
+        "--rate", type=float, default=100.0, help="messages per second, in total"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--send-via", choices=("ws", "http"), default="ws")
+    parser.add_argument("--connect-concurrency", type=int, default=50)
+    parser.add_argument(
+        "--database-url",
+        help="defaults to a fresh SQLite file; a Postgres URL must be migrated",
+    )
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "chat.sqlite")
+        args.database_url = f"sqlite+aiosqlite:///{path}"
+        # The writer cannot reserve ids from a sequence on SQLite; the
+        # single load-test worker is the only one writing messages
+        os.environ.setdefault("MESSAGE_WRITER_LOCAL_IDS", "true")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("REDIS_URL", "redis://fake")
+    os.environ.setdefault("SECRET_KEY", "loadtest")
+    os.environ.setdefault("WEBSOCKET_IDLE_TIMEOUT", "600")
+    os.environ.setdefault("DATABASE_POOL_SIZE", "20")
+
+
+def raise_file_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def serve(port: int) -> None:
+    """Child process: run one worker with the fake Redis swapped in."""
+    import fakeredis
+    import uvicorn
+
+    import app.db.redis
+
+    app.db.redis.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    from main import app as asgi_app
+
+    uvicorn.run(asgi_app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def seed(sockets: int, groups: int) -> tuple[List[str], List[int]]:
+    """Create the users, groups and memberships; return tokens and group ids.
+
+    Rows are inserted directly with a placeholder password hash, so seeding
+    does not spend minutes in bcrypt.
+    """
+    from datetime import timedelta
+
+    from sqlalchemy import insert
+
+    import app.models  # noqa: F401
+    from app.core.config import settings
+    from app.db.database import AsyncSessionLocal, Base, engine
+    from app.models.group import Group
+    from app.models.user import User, user_groups
+    from app.services.auth_service import AuthService
+
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    run_id = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(username=f"load_{run_id}_{index}", hashed_password="x")
+            for index in range(sockets)
+        ]
+        db.add_all(users)
+        await db.flush()
+        group_rows = [
+            Group(name=f"load_{run_id}_{index}", owner_id=users[index].id)
+            for index in range(groups)
+        ]
+        db.add_all(group_rows)
+        await db.flush()
+        group_ids = [group.id for group in group_rows]
+        await db.execute(
+            insert(user_groups),
+            [
+                {"user_id": user.id, "group_id": group_ids[index % groups]}
+                for index, user in enumerate(users)
+            ],
+        )
+        await db.commit()
+
+        auth = AuthService(db)
+        expires = timedelta(minutes=settings.access_token_expire_minutes + 60)
+        tokens = [
+            auth.create_access_token(
+                {"sub": str(user.id), "type": "normal"}, expires_delta=expires
+            )
+            for user in users
+        ]
+    await engine.dispose()
+    return tokens, group_ids
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_kib(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+async def scrape(client, name: str) -> float:
+    response = await client.get("/metrics")
+    for line in response.text.splitlines():
+        if line.startswith(f"{name} ") or line.startswith(f"{name}{{"):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class Client:
+    def __init__(self, token: str, group_id: int, latencies: List[float]):
+        self.token = token
+        self.group_id = group_id
+        self.latencies = latencies
+        self.websocket = None
+        self.reader: Optional[asyncio.Task] = None
+
+    async def connect(self, base_url: str) -> None:
+        from websockets.asyncio.client import connect
+
+        self.websocket = await connect(
+            f"{base_url}/api/ws/{self.group_id}?token={self.token}",
+            max_queue=None,
+            ping_interval=None,
+        )
+        # The presence snapshot is sent once the socket is registered
+        await self.websocket.recv()
+        self.reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        async for raw in self.websocket:
+            frame = json.loads(raw)
+            if frame["type"] == "message":
+                self.latencies.append(time.time() - float(frame["content"]))
+            elif frame["type"] == "ping":
+                await self.websocket.send('{"type": "pong"}')
+
+    async def send(self) -> None:
+        await self.websocket.send(json.dumps({"content": repr(time.time())}))
+
+    async def close(self) -> None:
+        if self.reader is not None:
+            self.reader.cancel()
+        await self.websocket.close()
+
+
+async def wait_until_ready(client, process: subprocess.Popen) -> None:
+    for _ in range(200):
+        if process.poll() is not None:
+            raise RuntimeError("Server process exited during startup")
+        try:
+            await client.get("/")
+            return
+        except Exception:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    tokens, group_ids = await seed(args.sockets, args.groups)
+    port = args.port or free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "scripts.loadtest", "--serve", "--port", str(port)],
+        env=os.environ.copy(),
+    )
+    base_http = f"http://127.0.0.1:{port}"
+    latencies: List[float] = []
+    clients = [
+        Client(token, group_ids[index % args.groups], latencies)
+        for index, token in enumerate(tokens)
+    ]
+    try:
+        async with httpx.AsyncClient(base_url=base_http, timeout=30) as http:
+            await wait_until_ready(http, process)
+            rss_before = rss_kib(process.pid)
+
+            limit = asyncio.Semaphore(args.connect_concurrency)
+
+            async def connect(client: Client) -> None:
+                async with limit:
+                    await client.connect(f"ws://127.0.0.1:{port}")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(connect(client) for client in clients))
+            connect_seconds = time.perf_counter() - started
+            await asyncio.sleep(1)
+            rss_after = rss_kib(process.pid)
+
+            commits_before = await scrape(http, "db_commits_total")
+            members: Dict[int, int] = {}
+            for client in clients:
+                members[client.group_id] = members.get(client.group_id, 0) + 1
+
+            sent = expected = 0
+            senders = cycle(clients)
+            interval = 1 / args.rate
+            started = time.perf_counter()
+            while time.perf_counter() - started < args.duration:
+                sender = next(senders)
+                if args.send_via == "ws":
+                    await sender.send()
+                else:
+                    asyncio.create_task(
+                        http.post(
+                            f"/api/groups/{sender.group_id}/messages",
+                            json={
+                                "content": repr(time.time()),
+                                "group_id": sender.group_id,
+                            },
+                            headers={"Authorization": f"Bearer {sender.token}"},
+                        )
+                    )
+                sent += 1
+                expected += members[sender.group_id]
+                next_send = started + sent * interval
+                await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            drive_seconds = time.perf_counter() - started
+
+            deadline = time.perf_counter() + 5
+            while len(latencies) < expected and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(
+                2 * int(os.environ.get("MESSAGE_FLUSH_INTERVAL_MS", "50")) / 1000
+            )
+            commits = await scrape(http, "db_commits_total") - commits_before
+
+            await asyncio.gather(
+                *(client.close() for client in clients), return_exceptions=True
+            )
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    latencies.sort()
+    print(f"sockets            {args.sockets} across {args.groups} groups")
+    print(f"connect rate       {args.sockets / connect_seconds:.0f} sockets/s")
+    if rss_before is not None and rss_after is not None:
+        per_socket = (rss_after - rss_before) / args.sockets
+        print(f"memory per socket  {per_socket:.1f} KiB (server RSS)")
+    print(
+        f"messages sent      {sent} via {args.send_via} ({sent / drive_seconds:.0f}/s)"
+    )
+    print(f"deliveries         {len(latencies)} of {expected}")
+    if latencies:
+        for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            print(
+                f"fan-out {label}        {percentile(latencies, fraction) * 1000:.1f} ms"
+            )
+        print(f"fan-out max        {latencies[-1] * 1000:.1f} ms")
+    print(f"DB commits/s       {commits / drive_seconds:.1f}")
+
+
+def main() -> None:
+    args = parse_args()
+    raise_file_limit()
+    if args.serve:
+        serve(args.port)
+        return
+    configure_environment(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
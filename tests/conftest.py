@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the environment has to be in place
+# before anything from app is imported
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}",
+)
+# A single pooled connection, so anything that holds one across requests
+# shows up as a hang instead of passing unnoticed
+os.environ.setdefault("DATABASE_POOL_SIZE", "1")
+os.environ.setdefault("DATABASE_MAX_OVERFLOW", "0")
+# SQLite has no sequence to reserve message ids from
+os.environ.setdefault("MESSAGE_WRITER_LOCAL_IDS", "true")
+os.environ.setdefault("REDIS_URL", "redis://fake")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+
+import app.db.redis  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(app.db.redis, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+async def database():
+    from app.db.database import Base, engine
+    import app.models  # noqa: F401
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services import websocket_service
+from app.services.broker import LocalBroker
+from app.services.websocket_service import ConnectionManager, dropped_clients
+
+
+class StalledSocket:
+    """Accepts but never finishes a send, like a client that stopped reading."""
+
+    def __init__(self):
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload):
+        await asyncio.Event().wait()
+
+    send_bytes = send_text
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+class RecordingSocket(StalledSocket):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    async def send_text(self, payload):
+        self.sent.append(payload)
+
+    send_bytes = send_text
+
+
+@pytest.fixture
+def manager():
+    manager = ConnectionManager(LocalBroker())
+    yield manager
+    for connection in list(manager.connections):
+        connection.writer.cancel()
+
+
+async def test_deliver_encodes_once_per_format(manager, monkeypatch):
+    calls = []
+    encode = websocket_service.encode
+
+    def counting_encode(payload, encoding):
+        calls.append(encoding)
+        return encode(payload, encoding)
+
+    monkeypatch.setattr(websocket_service, "encode", counting_encode)
+    connections = [
+        await manager.connect(StalledSocket(), 1, encoding=encoding)
+        for encoding in ("json", "msgpack", "deflate")
+        for _ in range(200)
+    ]
+    await asyncio.sleep(0)
+
+    payload = json.dumps({"type": "message", "id": 1, "content": "hi"})
+    await manager._deliver("group:1", payload)
+
+    # JSON is the published payload itself; the others are encoded once each
+    assert sorted(calls) == ["deflate", "msgpack"]
+    frames = {}
+    for connection in connections:
+        frame = connection.queue.get_nowait()
+        frames.setdefault(connection.encoding, set()).add(id(frame))
+    assert {encoding: len(ids) for encoding, ids in frames.items()} == {
+        "json": 1,
+        "msgpack": 1,
+        "deflate": 1,
+    }
+
+
+async def test_deliver_evicts_connections_whose_queue_overflows(manager, monkeypatch):
+    monkeypatch.setattr(settings, "websocket_send_queue_size", 2)
+    stalled = await manager.connect(StalledSocket(), 1)
+    reading_socket = RecordingSocket()
+    reading = await manager.connect(reading_socket, 1)
+    evicted_before = dropped_clients.value(reason="overflow")
+
+    # The stalled writer holds one frame in its send and the queue takes two
+    for index in range(3):
+        await manager._deliver("group:1", json.dumps({"n": index}))
+        await asyncio.sleep(0)
+    assert not stalled.closed
+
+    await manager._deliver("group:1", json.dumps({"n": 3}))
+    await asyncio.sleep(0)
+
+    assert stalled.closed
+    assert stalled not in manager.active_connections[1]
+    assert stalled.websocket.closed_with == 1013
+    assert dropped_clients.value(reason="overflow") == evicted_before + 1
+    assert not reading.closed
+    assert reading in manager.active_connections[1]
+    assert [json.loads(frame)["n"] for frame in reading_socket.sent] == [0, 1, 2, 3]
+
+
+class SlowClosingSocket(StalledSocket):
+    """Stalls on sends and takes ``delay`` seconds to finish a close."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    async def close(self, code=1000, reason=""):
+        await asyncio.sleep(self.delay)
+        self.closed_with = code
+
+
+async def test_drain_waits_for_close_handshakes(manager):
+    sockets = [SlowClosingSocket(0.05) for _ in range(3)]
+    for websocket in sockets:
+        await manager.connect(websocket, 1)
+
+    await manager.drain(timeout=0.5)
+
+    assert [websocket.closed_with for websocket in sockets] == [1012] * 3
+    assert not manager.connections
+
+
+async def test_drain_gives_up_on_closes_at_the_deadline(manager):
+    await manager.connect(SlowClosingSocket(60), 1)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    await manager.drain(timeout=0.2)
+
+    assert loop.time() - started < 1
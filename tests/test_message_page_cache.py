@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.group import GroupMessage
+from app.services.message_page_cache import COMPLETE, first_page_cache
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def message(message_id: int, group_id: int = 1) -> GroupMessage:
+    created_at = START + timedelta(seconds=message_id)
+    return GroupMessage(
+        id=message_id,
+        content=f"m{message_id}",
+        group_id=group_id,
+        author_id=1,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+async def test_trim_keeps_the_marker_and_one_message_more_than_a_page(
+    monkeypatch, fake_redis
+):
+    monkeypatch.setattr(settings, "message_page_cache_size", 3)
+    await first_page_cache.fill(1, [message(2), message(1)], limit=3, version=None)
+    await first_page_cache.add_many(message(index) for index in range(3, 10))
+
+    members = await fake_redis.zrange("group:1:first_page", 0, -1)
+    assert members[0] == COMPLETE
+    assert [int(member.partition(":")[0]) for member in members[1:]] == [6, 7, 8, 9]
+
+    page = json.loads(await first_page_cache.get(1, limit=3))
+    assert [item["id"] for item in page["items"]] == [9, 8, 7]
+    assert page["next_cursor"] is not None
+
+
+async def test_add_many_writes_each_group(fake_redis):
+    await first_page_cache.add_many([message(1, group_id=1), message(2, group_id=2)])
+    assert await fake_redis.zcard("group:1:first_page") == 1
+    assert await fake_redis.zcard("group:2:first_page") == 1
+
+
+async def test_fill_is_dropped_when_invalidated_after_the_read(fake_redis):
+    version = await first_page_cache.version(1)
+    messages = [message(2), message(1)]  # read from the database
+    await first_page_cache.invalidate(1)  # message 2 deleted meanwhile
+
+    page = json.loads(await first_page_cache.fill(1, messages, 10, version))
+    assert [item["id"] for item in page["items"]] == [2, 1]
+    assert await first_page_cache.get(1, limit=10) is None
+
+    version = await first_page_cache.version(1)
+    await first_page_cache.fill(1, [message(1)], 10, version)
+    page = json.loads(await first_page_cache.get(1, limit=10))
+    assert [item["id"] for item in page["items"]] == [1]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.message import MessageCreate
+from app.services.message_writer import (
+    DEAD_LETTER_KEY,
+    MessageWriter,
+    WriterBacklogFull,
+    dead_lettered_messages,
+    flushed_messages,
+)
+
+
+@pytest.fixture
+def writer(database):
+    return MessageWriter()
+
+
+async def test_flush_dead_letters_rows_the_database_rejects(writer, fake_redis):
+    first = await writer.submit(MessageCreate(content="first", group_id=1), 1)
+    assert await writer.flush()
+
+    flushed = flushed_messages.value()
+    dead_lettered = dead_lettered_messages.value()
+    await writer.submit(MessageCreate(content="before", group_id=1), 1)
+    await writer.submit(MessageCreate(content="duplicate", group_id=1), 1)
+    await writer.submit(MessageCreate(content="after", group_id=1), 1)
+    writer._pending[1]["id"] = first.id
+
+    assert await writer.flush()
+    assert writer._pending == []
+    assert flushed_messages.value() == flushed + 2
+    assert dead_lettered_messages.value() == dead_lettered + 1
+    entries = await fake_redis.lrange(DEAD_LETTER_KEY, 0, -1)
+    assert [json.loads(entry)["content"] for entry in entries] == ["duplicate"]
+
+
+async def test_submit_rejects_messages_while_the_backlog_cannot_flush(
+    writer, monkeypatch
+):
+    async def unreachable(rows):
+        raise ConnectionRefusedError()
+
+    monkeypatch.setattr(settings, "message_writer_max_pending", 2)
+    monkeypatch.setattr(writer, "_insert", unreachable)
+    for content in ("one", "two"):
+        await writer.submit(MessageCreate(content=content, group_id=1), 1)
+
+    with pytest.raises(WriterBacklogFull):
+        await writer.submit(MessageCreate(content="three", group_id=1), 1)
+    assert [row["content"] for row in writer._pending] == ["one", "two"]
+
+    monkeypatch.delattr(writer, "_insert")
+    await writer.submit(MessageCreate(content="three", group_id=1), 1)
+    assert [row["content"] for row in writer._pending] == ["three"]
+
+
+async def test_ids_outside_postgres_need_the_load_test_setting(writer, monkeypatch):
+    monkeypatch.setattr(settings, "message_writer_local_ids", False)
+    with pytest.raises(RuntimeError):
+        await writer.submit(MessageCreate(content="one", group_id=1), 1)
+
+
+async def test_messages_reach_the_page_cache_only_once_committed(writer, fake_redis):
+    await writer.submit(MessageCreate(content="one", group_id=1), 1)
+    assert await fake_redis.zcard("group:1:first_page") == 0
+
+    assert await writer.flush()
+    assert await fake_redis.zcard("group:1:first_page") == 1
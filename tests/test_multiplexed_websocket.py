@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.rate_limiter import rate_limiter
+
+
+def test_frames_with_a_malformed_group_id_are_rejected(database):
+    with TestClient(main.app) as client:
+        client.post("/api/auth/register", json={"username": "u", "password": "pw"})
+        token = client.post(
+            "/api/auth/login", data={"username": "u", "password": "pw"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        group = client.post("/api/groups/", json={"name": "g"}, headers=headers)
+        group_id = group.json()["id"]
+
+        with client.websocket_connect(f"/api/ws?token={token}") as ws:
+            ws.receive_json()  # presence snapshot
+            for bad in ([group_id], {}, "1", True):
+                ws.send_json({"group_id": bad, "content": "x"})
+                error = ws.receive_json()
+                assert (error["type"], error["code"]) == ("error", "invalid_frame")
+
+            ws.send_json({"group_id": group_id, "content": "still open"})
+            assert ws.receive_json()["content"] == "still open"
+
+
+def test_pongs_count_against_the_rate_limit(database, monkeypatch):
+    monkeypatch.setattr(settings, "websocket_rate_limit", 0.001)
+    monkeypatch.setattr(settings, "websocket_rate_burst", 2)
+    monkeypatch.setattr(rate_limiter, "_buckets", TTLCache(max_size=10, ttl=60))
+
+    with TestClient(main.app) as client:
+        client.post("/api/auth/register", json={"username": "p", "password": "pw"})
+        token = client.post(
+            "/api/auth/login", data={"username": "p", "password": "pw"}
+        ).json()["access_token"]
+
+        with client.websocket_connect(f"/api/ws?token={token}") as ws:
+            for _ in range(3):
+                ws.send_json({"type": "pong"})
+            error = ws.receive_json()
+            assert (error["type"], error["code"]) == ("error", "rate_limited")
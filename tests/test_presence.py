@@ -0,0 +1,33 @@
+from app.services.presence_service import PresenceService
+
+
+def went_offline(worker: PresenceService, group_id: int) -> set:
+    delta = worker._deltas.get(group_id)
+    return set() if delta is None else delta.offline
+
+
+async def test_member_stays_online_while_another_worker_holds_them():
+    first, second = PresenceService(), PresenceService()
+    await first.join(1, 7)
+    await second.join(1, 7)
+
+    await first.leave(1, 7)
+    assert went_offline(first, 1) == set()
+    assert (await second.snapshot(1))["online"] == [7]
+
+    await second.leave(1, 7)
+    assert went_offline(second, 1) == {7}
+    assert (await second.snapshot(1))["online"] == []
+
+
+async def test_expired_entry_of_another_worker_does_not_keep_a_member_online(
+    fake_redis,
+):
+    crashed, live = PresenceService(), PresenceService()
+    await crashed.join(1, "lawyer:3")
+    await live.join(1, "lawyer:3")
+    await fake_redis.hset("presence:1:lawyer:3", crashed.worker_id, 0)
+
+    await live.leave(1, "lawyer:3")
+    assert went_offline(live, 1) == {"lawyer:3"}
+    assert not await fake_redis.exists("presence:1:lawyer:3")
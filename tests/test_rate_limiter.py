@@ -0,0 +1,38 @@
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def small_burst(monkeypatch):
+    monkeypatch.setattr(settings, "websocket_rate_limit", 0.001)
+    monkeypatch.setattr(settings, "websocket_rate_burst", 3)
+
+
+async def allowed(limiter: RateLimiter, key, frames: int) -> int:
+    return sum([await limiter.allow(key) for _ in range(frames)])
+
+
+async def test_local_buckets_limit_each_member():
+    limiter = RateLimiter()
+    assert await allowed(limiter, 1, 5) == 3
+    assert await allowed(limiter, "lawyer:1", 5) == 3
+
+
+async def test_evicted_local_bucket_starts_full(monkeypatch):
+    monkeypatch.setattr(settings, "websocket_rate_limit_cache_size", 1)
+    limiter = RateLimiter()
+    assert await allowed(limiter, 1, 3) == 3
+    assert await allowed(limiter, 2, 1) == 1
+    assert await allowed(limiter, 1, 3) == 3
+
+
+async def test_redis_buckets_are_shared_across_workers(monkeypatch, fake_redis):
+    monkeypatch.setattr(settings, "websocket_rate_limit_redis", True)
+    first, second = RateLimiter(), RateLimiter()
+    assert await allowed(first, 1, 2) == 2
+    assert await allowed(second, 1, 3) == 1
+    assert await allowed(second, 2, 1) == 1
+
+    assert await fake_redis.ttl("ratelimit:ws:1") > 0
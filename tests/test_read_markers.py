@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+from app.services.message_writer import message_writer
+
+
+def register(client: TestClient, username: str) -> dict:
+    client.post("/api/auth/register", json={"username": username, "password": "pw"})
+    response = client.post(
+        "/api/auth/login", data={"username": username, "password": "pw"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def unread(client: TestClient, headers: dict) -> dict:
+    sidebar = client.get("/api/groups/sidebar", headers=headers).json()
+    return {group["id"]: group["unread_count"] for group in sidebar}
+
+
+def test_mark_read_accepts_messages_not_flushed_yet(database, monkeypatch):
+    # Nothing reaches the database until the test flushes
+    monkeypatch.setattr(settings, "message_flush_interval_ms", 600000)
+
+    with TestClient(main.app) as client:
+        alice, bob = register(client, "alice"), register(client, "bob")
+        group = client.post("/api/groups/", json={"name": "g"}, headers=alice)
+        group_id = group.json()["id"]
+        client.post(f"/api/groups/{group_id}/join", headers=bob)
+        assert unread(client, bob) == {group_id: 0}
+
+        token = alice["Authorization"].removeprefix("Bearer ")
+        ids = []
+        with client.websocket_connect(f"/api/ws/{group_id}?token={token}") as ws:
+            ws.receive_json()  # presence snapshot
+            for index in range(3):
+                ws.send_json({"content": f"m{index}"})
+                ids.append(ws.receive_json()["id"])
+        assert message_writer._pending
+        assert unread(client, bob) == {group_id: 3}
+
+        read = client.post(
+            f"/api/groups/{group_id}/read", json={"message_id": ids[1]}, headers=bob
+        )
+        assert read.status_code == 200
+        assert read.json() == {
+            "group_id": group_id,
+            "last_read_message_id": ids[1],
+            "unread_count": 1,
+        }
+        assert unread(client, bob) == {group_id: 1}
+
+        # Markers never move back
+        read = client.post(
+            f"/api/groups/{group_id}/read", json={"message_id": ids[0]}, headers=bob
+        )
+        assert read.json()["unread_count"] == 1
+
+        read = client.post(f"/api/groups/{group_id}/read", headers=bob)
+        assert read.json()["last_read_message_id"] == ids[2]
+        assert unread(client, bob) == {group_id: 0}
+
+        client.portal.call(message_writer.flush)
+        assert client.get("/api/groups/sidebar", headers=alice).status_code == 200
+        assert unread(client, bob) == {group_id: 0}
@@ -0,0 +1,45 @@
+from app.services.unread_service import UnreadCounters
+
+
+async def test_set_unread_counts_against_the_current_sequence():
+    counters = UnreadCounters()
+    for _ in range(5):
+        await counters.on_message(1, author_user_id=None)
+
+    await counters.set_unread(7, {1: 2, 2: 0})
+    assert await counters.counts(7, [1, 2]) == {1: 2, 2: 0}
+
+    await counters.on_message(1, author_user_id=None)
+    await counters.on_message(2, author_user_id=None)
+    assert await counters.counts(7, [1, 2]) == {1: 3, 2: 1}
+
+
+async def test_forget_message_only_moves_users_who_had_not_read_it():
+    counters = UnreadCounters()
+    for _ in range(3):
+        await counters.on_message(1, author_user_id=None)
+    await counters.set_unread(7, {1: 2})
+    await counters.set_unread(8, {1: 0})
+
+    # 7 had not read the deleted message; 8 had, and 9 has no counter yet
+    await counters.forget_message(1, [7, 9])
+
+    assert await counters.counts(7, [1]) == {1: 1}
+    assert await counters.counts(8, [1]) == {1: 0}
+    assert await counters.counts(9, [1]) == {1: None}
+    await counters.on_message(1, author_user_id=None)
+    assert await counters.counts(7, [1]) == {1: 2}
+    assert await counters.counts(8, [1]) == {1: 1}
+
+
+async def test_own_message_does_not_create_the_authors_counter():
+    counters = UnreadCounters()
+    for _ in range(5):
+        await counters.on_message(1, author_user_id=None)
+
+    await counters.on_message(1, author_user_id=7)
+    assert await counters.counts(7, [1]) == {1: None}
+
+    await counters.set_unread(7, {1: 0})
+    await counters.on_message(1, author_user_id=7)
+    assert await counters.counts(7, [1]) == {1: 0}
@@ -0,0 +1,40 @@
+from contextlib import ExitStack
+
+from fastapi.testclient import TestClient
+
+import main
+from app.db.database import engine
+
+
+def register(client: TestClient, username: str) -> str:
+    client.post("/api/auth/register", json={"username": username, "password": "pw"})
+    response = client.post(
+        "/api/auth/login", data={"username": username, "password": "pw"}
+    )
+    return response.json()["access_token"]
+
+
+def test_open_sockets_do_not_hold_pooled_connections(database):
+    assert engine.pool.size() == 1
+
+    with TestClient(main.app) as client:
+        token = register(client, "alice")
+        headers = {"Authorization": f"Bearer {token}"}
+        group = client.post("/api/groups/", json={"name": "g"}, headers=headers)
+        group_id = group.json()["id"]
+
+        with ExitStack() as stack:
+            sockets = [
+                stack.enter_context(
+                    client.websocket_connect(f"/api/ws/{group_id}?token={token}")
+                )
+                for _ in range(200)
+            ]
+            assert engine.pool.checkedout() == 0
+
+            response = client.get(f"/api/groups/{group_id}/messages", headers=headers)
+            assert response.status_code == 200
+
+            sockets[0].send_text('{"content": "hello"}')
+            sockets[-1].receive_json()  # presence snapshot
+            assert sockets[-1].receive_json()["content"] == "hello"